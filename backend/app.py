@@ -1,12 +1,23 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, make_response, request, send_file
+from functools import wraps
 from flask_cors import CORS
 import redis
 import json
 import logging
 from datetime import datetime
+import os
 import threading
-import time
 from scraper import CromaProductScraper
+from jobs import JobQueue, RedisLock
+from worker import ScrapeWorker
+from scheduler import RescrapeScheduler
+from tasks import DEFAULT_CATEGORY_URL
+from warm_start import SNAPSHOT_ENABLED, catalog_age, is_fresh, restore_snapshot
+from storage import ProductStore
+from image_cache import default_image_cache, is_valid_key
+from filter_index import FilterIndex, SORT_FIELDS
+from serialization import dumps, install_flask_json
+from http_cache import compress_response, is_not_modified, make_etag, to_http_date
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,130 +25,165 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)
+install_flask_json(app)
 
 # Redis connection with error handling
 try:
-    r = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+    # Binary replies so msgpack product payloads can be read; the store decodes text itself
+    r = redis.Redis(host='localhost', port=6379, db=0)
     r.ping()  # Test connection
     logger.info("Successfully connected to Redis")
 except redis.ConnectionError:
     logger.error("Failed to connect to Redis. Make sure Redis server is running on localhost:6379")
     r = None
 
+# Per-product storage layer
+store = ProductStore(r, image_cache=default_image_cache(r)) if r else None
+if store:
+    store.migrate_legacy_blob()
+    store.ensure_search_index()
+
 # Global scraper instance
 scraper = CromaProductScraper()
-scraping_in_progress = False
 
-def auto_scrape_products():
-    """Automatically scrape products on startup"""
-    global scraping_in_progress
-    if scraping_in_progress:
-        return
-    
-    scraping_in_progress = True
-    logger.info("🚀 Auto-scraping products on startup...")
+# Scrapes run as queued jobs; the lock is shared by every API and worker process
+job_queue = JobQueue(r) if r else None
+scrape_lock = RedisLock(r) if r else None
+
+# Set SCRAPE_WORKER_EMBEDDED=0 when running worker.py as separate processes
+EMBEDDED_WORKER = os.environ.get("SCRAPE_WORKER_EMBEDDED", "1") != "0"
+
+# Listing pages fetched by the startup full scrape; more than one are split across worker processes
+FULL_SCRAPE_PAGES = int(os.environ.get("FULL_SCRAPE_PAGES", "1"))
+
+# Periodic re-scrape of listing pages; RESCRAPE_CATEGORIES is a comma-separated list of category URLs
+SCHEDULER_ENABLED = os.environ.get("SCRAPE_SCHEDULER", "1") != "0"
+RESCRAPE_CATEGORIES = [u.strip() for u in os.environ.get("RESCRAPE_CATEGORIES", DEFAULT_CATEGORY_URL).split(",")
+                       if u.strip()]
+
+# In-process cache of the decoded catalog, keyed on the catalog version
+_catalog_cache = {"version": None, "products": None, "filter_index": None}
+_catalog_cache_lock = threading.Lock()
+
+def get_cached_products():
+    """
+    Return the decoded product list, re-reading Redis only when the catalog
+    version changed. Costs one GET per call while the catalog is unchanged.
+    The returned list is shared between requests and must not be mutated.
+    """
+    version = store.get_version()
+    cached = _catalog_cache
+    if cached["products"] is not None and cached["version"] == version:
+        return cached["products"]
     
-    try:
-        url = "https://www.croma.com/televisions-accessories/c/997"
-        products = scraper.scrape_with_selenium(url)
+    with _catalog_cache_lock:
+        # Another thread may have refreshed the cache while we waited
+        if _catalog_cache["products"] is not None and _catalog_cache["version"] == version:
+            return _catalog_cache["products"]
         
-        if products:
-            # Store in Redis
-            data = {
-                "products": products,
-                "total_products": len(products),
-                "scraped_at": datetime.now().isoformat(),
-                "source": "auto_scrape",
-                "scrape_type": "initial_load"
-            }
-            
-            if r:
-                r.set("products", json.dumps(products))
-                r.set("scraped_content", json.dumps(data))
-                logger.info(f"✅ Auto-scraped and stored {len(products)} products")
-            else:
-                logger.error("❌ Redis not available for storing scraped data")
-        else:
-            logger.error("❌ Auto-scraping failed - no products returned")
-            
-    except Exception as e:
-        logger.error(f"❌ Auto-scraping error: {e}")
-    finally:
-        scraping_in_progress = False
-
-def scrape_more_products():
-    """Scrape additional products by clicking VIEW MORE"""
-    global scraping_in_progress
-    if scraping_in_progress:
-        return []
+        products = store.get_all()
+        _catalog_cache["products"] = products
+        _catalog_cache["version"] = version
+        _catalog_cache["filter_index"] = None
+        logger.info(f"🗃️ Catalog cache refreshed: {len(products)} products (version {version})")
+        return products
+
+def get_filter_index():
+    """Return the filter indexes for the cached catalog, building them once per version"""
+    products = get_cached_products()
+    index = _catalog_cache["filter_index"]
+    if index is not None and index.products is products:
+        return index
     
-    scraping_in_progress = True
-    logger.info("🔄 Scraping more products with VIEW MORE...")
+    with _catalog_cache_lock:
+        index = _catalog_cache["filter_index"]
+        if index is None or index.products is not products:
+            index = FilterIndex(products)
+            _catalog_cache["filter_index"] = index
+        return index
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+# Products serialized per chunk of a streamed response
+STREAM_CHUNK_SIZE = 100
+
+def wants_ndjson():
+    """True when the client asked for newline-delimited JSON via the Accept header"""
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+def stream_products(chunks, envelope):
+    """
+    Stream product chunks as NDJSON (one product per line) or as the usual JSON
+    body with `envelope` fields first and the products as a trailing "data" array.
+    Only one chunk is serialized at a time, so memory per request stays constant.
+    """
+    if wants_ndjson():
+        def generate_ndjson():
+            for chunk in chunks:
+                if chunk:
+                    yield "".join(dumps(product) + "\n" for product in chunk)
+        return Response(generate_ndjson(), mimetype=NDJSON_MIMETYPE)
     
-    try:
-        # Modify scraper to click VIEW MORE once and get additional products
-        url = "https://www.croma.com/televisions-accessories/c/997"
-        additional_products = scraper.scrape_with_view_more(url)
-        
-        if additional_products:
-            # Get existing products
-            existing_data = []
-            if r:
-                existing_products_json = r.get("products")
-                if existing_products_json:
-                    existing_data = json.loads(existing_products_json)
-            
-            # Better duplicate detection - create a set of existing product signatures
-            existing_signatures = set()
-            for existing in existing_data:
-                # Create unique signature using title + price + brand
-                signature = f"{existing.get('title', '').strip()}|{existing.get('current_price', '')}|{existing.get('brand', '')}"
-                existing_signatures.add(signature)
-            
-            logger.info(f"📊 Existing products: {len(existing_data)}, New scraped: {len(additional_products)}")
-            
-            # Combine with new products (avoiding duplicates)
-            all_products = existing_data.copy()
-            new_count = 0
-            duplicates_skipped = 0
-            
-            for product in additional_products:
-                # Create signature for new product
-                product_signature = f"{product.get('title', '').strip()}|{product.get('current_price', '')}|{product.get('brand', '')}"
-                
-                if product_signature not in existing_signatures:
-                    all_products.append(product)
-                    existing_signatures.add(product_signature)  # Add to set for next iterations
-                    new_count += 1
-                else:
-                    duplicates_skipped += 1
+    def generate_json():
+        # Envelope without its closing brace, then the array
+        yield dumps(envelope)[:-1] + ',"data":['
+        first = True
+        for chunk in chunks:
+            if not chunk:
+                continue
+            yield ("" if first else ",") + ",".join(dumps(product) for product in chunk)
+            first = False
+        yield "]}"
+    return Response(generate_json(), mimetype="application/json")
+
+def chunked(items, size=STREAM_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+# Clients may keep responses but must revalidate; unchanged data then costs a 304
+CACHE_CONTROL = "public, no-cache"
+
+def cached_by_catalog(extra_tag=None):
+    """
+    Conditional GET for views whose body depends only on the stored catalog and
+    the request. The ETag combines the catalog version with the URL and Accept
+    header, so a matching If-None-Match (or If-Modified-Since) answers 304
+    without running the view. `extra_tag` adds state outside the catalog version.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not store:
+                return view(*args, **kwargs)
+            version, updated_at = store.get_version_info()
+            if version is None:
+                return view(*args, **kwargs)
             
-            logger.info(f"🔍 Duplicate check: {new_count} new, {duplicates_skipped} duplicates skipped")
+            etag = make_etag(version, request.full_path, request.headers.get("Accept", ""),
+                             extra_tag() if extra_tag else "")
+            last_modified = to_http_date(updated_at)
+            if is_not_modified(request, etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
             
-            # Store updated data
-            if r and new_count > 0:
-                data = {
-                    "products": all_products,
-                    "total_products": len(all_products),
-                    "scraped_at": datetime.now().isoformat(),
-                    "source": "view_more_scrape",
-                    "scrape_type": "load_more",
-                    "new_products_added": new_count
-                }
-                
-                r.set("products", json.dumps(all_products))
-                r.set("scraped_content", json.dumps(data))
-                logger.info(f"✅ Added {new_count} new products (total: {len(all_products)})")
-                
-                return additional_products[-new_count:] if new_count > 0 else []
-        
-        return []
-        
-    except Exception as e:
-        logger.error(f"❌ VIEW MORE scraping error: {e}")
-        return []
-    finally:
-        scraping_in_progress = False
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers["Cache-Control"] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+def scraped_at_tag():
+    metadata = store.get_metadata() or {}
+    return metadata.get("scraped_at", "")
+
+@app.after_request
+def compress(response):
+    """gzip/brotli for JSON bodies, including streamed ones"""
+    return compress_response(request, response)
 
 @app.route("/", methods=["GET"])
 def home():
@@ -150,6 +196,8 @@ def home():
             "/scraped-content": "Get complete scraped content including metadata",
             "/products/search": "Search products by query parameter",
             "/products/filter": "Filter products by brand, price range, etc.",
+            "/products/<product_id>/history": "Price history with min/max/avg",
+            "/images/<key>": "Cached product image thumbnail",
             "/health": "Health check endpoint"
         },
         "status": "active"
@@ -169,6 +217,7 @@ def health_check():
     })
 
 @app.route("/scraped-content", methods=["GET"])
+@cached_by_catalog(extra_tag=scraped_at_tag)
 def get_scraped_content():
     """
     Retrieve complete scraped content from Redis including metadata.
@@ -181,9 +230,11 @@ def get_scraped_content():
         }), 503
     
     try:
-        data = r.get("scraped_content")
-        if data:
-            parsed_data = json.loads(data)
+        parsed_data = store.get_metadata()
+        if parsed_data:
+            if "products" not in parsed_data:
+                # Metadata only; products are stored per key
+                parsed_data["products"] = get_cached_products()
             return jsonify({
                 "success": True, 
                 "data": parsed_data,
@@ -212,54 +263,28 @@ def get_scraped_content():
 @app.route("/products/load-more", methods=["POST"])
 def load_more_products():
     """
-    Load more products by scraping with VIEW MORE button.
-    This endpoint triggers live scraping to get additional products.
+    Queue a VIEW MORE scrape and return its job id immediately.
+    Poll /scraping/jobs/<job_id> for progress and the result.
     """
-    global scraping_in_progress
-    
-    if scraping_in_progress:
+    if not r:
         return jsonify({
             "success": False,
-            "message": "Scraping already in progress. Please wait."
-        }), 429
+            "message": "Redis connection not available"
+        }), 503
     
     try:
-        logger.info("🔄 Starting VIEW MORE scraping synchronously...")
-        
-        # Run scraping synchronously for better reliability
-        result = scrape_more_products()
-        
-        # Get the updated products immediately
-        if r:
-            products_data = r.get("products")
-            if products_data:
-                products = json.loads(products_data)
-                
-                # Get metadata about the scraping
-                content_data = r.get("scraped_content")
-                metadata = {}
-                if content_data:
-                    content = json.loads(content_data)
-                    metadata = {
-                        "new_products_added": content.get("new_products_added", 0),
-                        "total_products": content.get("total_products", len(products)),
-                        "scrape_type": content.get("scrape_type", "load_more"),
-                        "scraping_completed": True
-                    }
-                
-                logger.info(f"✅ VIEW MORE response: {len(products)} total products, {metadata.get('new_products_added', 0)} new")
-                
-                return jsonify({
-                    "success": True,
-                    "data": products,
-                    "metadata": metadata,
-                    "message": f"Successfully loaded {metadata.get('new_products_added', 0)} new products"
-                })
+        # Repeated clicks while a load-more job is pending share that job
+        job_id, created = job_queue.enqueue("load_more")
+        job = job_queue.get(job_id)
+        logger.info(f"🔄 {'Queued' if created else 'Reusing'} VIEW MORE job {job_id}")
         
         return jsonify({
-            "success": False,
-            "message": "Failed to load more products - no data available"
-        }), 500
+            "success": True,
+            "job_id": job_id,
+            "status": job["status"] if job else "queued",
+            "status_url": f"/scraping/jobs/{job_id}",
+            "message": "Loading more products" if created else "Load more already in progress"
+        }), 202
         
     except Exception as e:
         logger.error(f"Error in load_more_products: {e}")
@@ -268,24 +293,46 @@ def load_more_products():
             "message": "Internal server error"
         }), 500
 
+@app.route("/scraping/jobs/<job_id>", methods=["GET"])
+def get_scraping_job(job_id):
+    """Get status, progress and result of a scrape job"""
+    if not r:
+        return jsonify({
+            "success": False,
+            "message": "Redis connection not available"
+        }), 503
+    
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({
+            "success": False,
+            "message": f"Job '{job_id}' not found"
+        }), 404
+    
+    return jsonify({
+        "success": True,
+        "data": job
+    })
+
 @app.route("/scraping/status", methods=["GET"])
 def scraping_status():
     """Get current scraping status"""
-    global scraping_in_progress
-    
     return jsonify({
         "success": True,
-        "scraping_in_progress": scraping_in_progress,
+        "scraping_in_progress": scrape_lock.locked() if scrape_lock else False,
+        "queued_jobs": job_queue.queue_length() if job_queue else 0,
         "redis_available": r is not None
     })
 
 @app.route("/products", methods=["GET"])
+@cached_by_catalog()
 def get_products():
     """
     Get all products with optional pagination.
     Query parameters:
     - page: page number (default: 1)
     - limit: products per page (default: 20)
+    - all: true to stream every product (NDJSON with `Accept: application/x-ndjson`)
     """
     if not r:
         return jsonify({
@@ -307,22 +354,21 @@ def get_products():
         if not get_all and (limit < 1 or limit > 1000):
             limit = 20
         
-        # Get products from Redis
-        products_data = r.get("products")
-        if not products_data:
+        # Only the total is needed up front; products are fetched per page
+        total_products = store.count()
+        if not total_products:
             return jsonify({
                 "success": False,
                 "message": "No product data found. Please run the scraper first.",
                 "suggestion": "Run 'python scraper.py' to collect fresh data"
             }), 404
         
-        products = json.loads(products_data)
-        
         # Return all products or apply pagination
         if get_all:
-            return jsonify({
+            # Streamed from the shared catalog snapshot instead of one jsonify'd body
+            products = get_cached_products()
+            return stream_products(chunked(products), {
                 "success": True,
-                "data": products,
                 "total_products": len(products),
                 "all_products": True
             })
@@ -330,7 +376,7 @@ def get_products():
             # Apply pagination
             start_idx = (page - 1) * limit
             end_idx = start_idx + limit
-            paginated_products = products[start_idx:end_idx]
+            paginated_products = store.get_page(start_idx, limit)
             
             return jsonify({
                 "success": True,
@@ -338,9 +384,9 @@ def get_products():
                 "pagination": {
                     "page": page,
                     "limit": limit,
-                    "total_products": len(products),
-                    "total_pages": (len(products) + limit - 1) // limit,
-                    "has_next": end_idx < len(products),
+                    "total_products": total_products,
+                    "total_pages": (total_products + limit - 1) // limit,
+                    "has_next": end_idx < total_products,
                     "has_prev": page > 1
                 }
             })
@@ -358,9 +404,11 @@ def get_products():
         }), 500
 
 @app.route("/products/search", methods=["GET"])
+@cached_by_catalog()
 def search_products():
     """
-    Search products by title, brand, or other attributes.
+    Search products by title or brand, ranked by relevance.
+    Every query word must match a whole word or the start of a word.
     Query parameters:
     - q: search query (required)
     - page: page number (default: 1)
@@ -380,42 +428,32 @@ def search_products():
         }), 503
     
     try:
-        # Get products from Redis
-        products_data = r.get("products")
-        if not products_data:
+        # Pagination
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = request.args.get('limit', 20, type=int)
+        if limit < 1 or limit > 1000:
+            limit = 20
+        start_idx = (page - 1) * limit
+        
+        # Ranked lookup in the inverted index; cost depends on the result size
+        paginated_results, total_results = store.search(query, start_idx, limit)
+        if not total_results and not store.count():
             return jsonify({
                 "success": False,
                 "message": "No product data found"
             }), 404
         
-        products = json.loads(products_data)
-        
-        # Filter products based on search query
-        filtered_products = []
-        for product in products:
-            title = product.get('title', '').lower()
-            brand = product.get('brand', '').lower()
-            if query in title or query in brand:
-                filtered_products.append(product)
-        
-        # Pagination
-        page = request.args.get('page', 1, type=int)
-        limit = request.args.get('limit', 20, type=int)
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        paginated_results = filtered_products[start_idx:end_idx]
-        
         return jsonify({
             "success": True,
             "data": paginated_results,
             "search": {
                 "query": query,
-                "total_results": len(filtered_products)
+                "total_results": total_results
             },
             "pagination": {
                 "page": page,
                 "limit": limit,
-                "total_pages": (len(filtered_products) + limit - 1) // limit
+                "total_pages": (total_results + limit - 1) // limit
             }
         })
         
@@ -427,14 +465,23 @@ def search_products():
         }), 500
 
 @app.route("/products/filter", methods=["GET"])
+@cached_by_catalog()
 def filter_products():
     """
     Filter products by various criteria.
     Query parameters:
-    - brand: filter by brand
-    - min_price: minimum price (remove ₹ and commas)
-    - max_price: maximum price
+    - brand: filter by brand (exact, case-insensitive)
+    - min_price: minimum price in rupees
+    - max_price: maximum price in rupees
     - rating: minimum rating
+    - min_discount: minimum discount percent
+    - sort: price, rating or discount (default: catalog order)
+    - order: asc or desc (default: asc)
+    - page: page number (default: 1)
+    - limit: products per page (default: 20)
+    - all: true to stream every match instead of one page
+    Products without a price or rating never match a price or rating filter.
+    With all=true, `Accept: application/x-ndjson` streams one product per line.
     """
     if not r:
         return jsonify({
@@ -448,56 +495,76 @@ def filter_products():
         min_price = request.args.get('min_price', type=float)
         max_price = request.args.get('max_price', type=float)
         min_rating = request.args.get('rating', type=float)
+        min_discount = request.args.get('min_discount', type=float)
+        sort = request.args.get('sort', '').strip().lower() or None
+        descending = request.args.get('order', 'asc').strip().lower() == 'desc'
+        get_all = request.args.get('all', 'false').lower() == 'true'
+        
+        if sort and sort not in SORT_FIELDS:
+            return jsonify({
+                "success": False,
+                "message": f"Invalid sort '{sort}'. Use one of: {', '.join(SORT_FIELDS)}"
+            }), 400
+        
+        # Pagination
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = request.args.get('limit', 20, type=int)
+        if limit < 1 or limit > 1000:
+            limit = 20
         
-        # Get products from Redis
-        products_data = r.get("products")
-        if not products_data:
+        index = get_filter_index()
+        if not index.products:
             return jsonify({
                 "success": False,
                 "message": "No product data found"
             }), 404
         
-        products = json.loads(products_data)
+        # Answered by intersecting the precomputed indexes
+        positions = index.query(
+            brand=brand_filter or None,
+            min_price=round(min_price * 100) if min_price is not None else None,
+            max_price=round(max_price * 100) if max_price is not None else None,
+            min_rating=min_rating,
+            min_discount=min_discount,
+            sort=sort,
+            descending=descending
+        )
         
-        # Apply filters
-        filtered_products = []
-        for product in products:
-            # Brand filter
-            if brand_filter and brand_filter not in product.get('brand', '').lower():
-                continue
-            
-            # Price filter
-            current_price_str = product.get('current_price', '₹0')
-            try:
-                current_price = float(current_price_str.replace('₹', '').replace(',', ''))
-                if min_price and current_price < min_price:
-                    continue
-                if max_price and current_price > max_price:
-                    continue
-            except (ValueError, AttributeError):
-                pass
-            
-            # Rating filter
-            if min_rating:
-                try:
-                    rating = float(product.get('rating', '0'))
-                    if rating < min_rating:
-                        continue
-                except (ValueError, TypeError):
-                    continue
-            
-            filtered_products.append(product)
+        total_results = len(positions)
+        start_idx = (page - 1) * limit
+        end_idx = start_idx + limit
+        
+        filters_applied = {
+            "brand": brand_filter,
+            "min_price": min_price,
+            "max_price": max_price,
+            "min_rating": min_rating,
+            "min_discount": min_discount,
+            "sort": sort,
+            "order": "desc" if descending else "asc"
+        }
+        
+        if get_all:
+            # Every match, streamed chunk by chunk
+            return stream_products((index.get_products(chunk) for chunk in chunked(positions)), {
+                "success": True,
+                "filters_applied": filters_applied,
+                "total_results": total_results,
+                "all_results": True
+            })
         
         return jsonify({
             "success": True,
-            "data": filtered_products,
-            "filters_applied": {
-                "brand": brand_filter,
-                "min_price": min_price,
-                "max_price": max_price,
-                "min_rating": min_rating
-            },
-            "total_results": len(filtered_products)
+            "data": index.get_products(positions[start_idx:end_idx]),
+            "filters_applied": filters_applied,
+            "total_results": total_results,
+            "pagination": {
+                "page": page,
+                "limit": limit,
+                "total_pages": (total_results + limit - 1) // limit,
+                "has_next": end_idx < total_results,
+                "has_prev": page > 1
+            }
         })
         
     except Exception as e:
@@ -508,6 +575,7 @@ def filter_products():
         }), 500
 
 @app.route("/products/<product_id>", methods=["GET"])
+@cached_by_catalog()
 def get_product_by_id(product_id):
     """Get a specific product by its ID"""
     if not r:
@@ -517,30 +585,113 @@ def get_product_by_id(product_id):
         }), 503
     
     try:
-        products_data = r.get("products")
-        if not products_data:
+        product = store.get_product(product_id)
+        if product:
+            return jsonify({
+                "success": True,
+                "data": product
+            })
+        
+        return jsonify({
+            "success": False,
+            "message": f"Product with ID '{product_id}' not found"
+        }), 404
+        
+    except Exception as e:
+        logger.error(f"Error getting product by ID: {e}")
+        return jsonify({
+            "success": False,
+            "message": "Internal server error"
+        }), 500
+
+@app.route("/products/<product_id>/history", methods=["GET"])
+def get_product_price_history(product_id):
+    """
+    Price history of a product, recorded whenever its price or discount changed.
+    Query parameters:
+    - from, to: unix timestamps bounding the window (default: whole history)
+    - limit: most recent points to return (default: 500, max: 5000)
+    Stats cover the whole history, or the window when from/to is given.
+    """
+    if not r:
+        return jsonify({
+            "success": False,
+            "message": "Redis connection not available"
+        }), 503
+    
+    try:
+        start = request.args.get('from', type=int)
+        end = request.args.get('to', type=int)
+        limit = request.args.get('limit', 500, type=int)
+        if limit < 1 or limit > 5000:
+            limit = 500
+        
+        history = store.price_history
+        if start is None and end is None:
+            # O(1): running aggregates maintained on every recorded change
+            stats = history.get_stats(product_id)
+            points = history.get_points(product_id, limit=limit) if stats else []
+        else:
+            # Aggregated in Redis; only the most recent `limit` points are transferred
+            stats = history.get_window_stats(product_id, start, end)
+            points = history.get_points(product_id, start, end, limit=limit) if stats else []
+        
+        if not stats:
             return jsonify({
                 "success": False,
-                "message": "No product data found"
+                "message": f"No price history for product '{product_id}'"
             }), 404
         
-        products = json.loads(products_data)
-        
-        # Find product by ID
-        for product in products:
-            if product.get('product_id') == product_id:
-                return jsonify({
-                    "success": True,
-                    "data": product
-                })
+        return jsonify({
+            "success": True,
+            "data": {
+                "product_id": product_id,
+                "points": points,
+                "stats": stats
+            },
+            "returned_points": len(points)
+        })
         
+    except Exception as e:
+        logger.error(f"Error getting price history: {e}")
         return jsonify({
             "success": False,
-            "message": f"Product with ID '{product_id}' not found"
+            "message": "Internal server error"
+        }), 500
+
+# Image keys never change meaning, so clients may keep them for a year
+IMAGE_MAX_AGE = 365 * 24 * 3600
+
+@app.route("/images/<key>", methods=["GET"])
+def get_product_image(key):
+    """Serve a cached product thumbnail, fetching it from the CDN on first use"""
+    if not store or not store.image_cache:
+        return jsonify({
+            "success": False,
+            "message": "Image cache not available"
+        }), 503
+    
+    if not is_valid_key(key):
+        return jsonify({
+            "success": False,
+            "message": f"Invalid image key '{key}'"
         }), 404
+    
+    try:
+        cached = store.image_cache.get(key)
+        if cached is None:
+            return jsonify({
+                "success": False,
+                "message": f"Image '{key}' not found"
+            }), 404
+        
+        path, mimetype = cached
+        response = send_file(path, mimetype=mimetype, max_age=IMAGE_MAX_AGE, conditional=True)
+        response.headers["Cache-Control"] = f"public, max-age={IMAGE_MAX_AGE}, immutable"
+        return response
         
     except Exception as e:
-        logger.error(f"Error getting product by ID: {e}")
+        logger.error(f"Error serving image {key}: {e}")
         return jsonify({
             "success": False,
             "message": "Internal server error"
@@ -571,21 +722,55 @@ def initialize_app():
     logger.info("  GET /scraped-content  - Get complete scraped data")
     logger.info("  GET /products/search  - Search products")
     logger.info("  GET /products/filter  - Filter products")
-    logger.info("  POST /products/load-more - Load more products (LIVE)")
+    logger.info("  GET /products/<id>/history - Price history of a product")
+    logger.info("  GET /images/<key>     - Cached product thumbnail")
+    logger.info("  POST /products/load-more - Queue a load-more scrape (LIVE)")
+    logger.info("  GET /scraping/jobs/<id> - Get scrape job progress")
     logger.info("  GET /scraping/status  - Get scraping status")
     
-    # Start auto-scraping in background
-    def startup_scrape():
-        time.sleep(3)  # Give the app time to start
-        logger.info("🔥 Starting automatic product scraping...")
-        auto_scrape_products()
+    if not r:
+        logger.error("❌ Redis not available, scraping disabled")
+        return
+    
+    # Restore and check the catalog first, so the scheduler and worker see the warm state
+    warm_start()
+    
+    if EMBEDDED_WORKER:
+        worker = ScrapeWorker(r, scraper=scraper, store=store)
+        thread = threading.Thread(target=worker.run_forever, daemon=True)
+        thread.start()
+        logger.info("👷 Embedded scrape worker started")
     
-    thread = threading.Thread(target=startup_scrape)
-    thread.daemon = True
-    thread.start()
+    if SCHEDULER_ENABLED:
+        scheduler = RescrapeScheduler(r, job_queue, RESCRAPE_CATEGORIES)
+        thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+        thread.start()
     
     logger.info("✅ API server initialized with LIVE auto-scraping enabled!")
 
+def warm_start():
+    """
+    Serve the stored catalog right away and only scrape when it is stale.
+    An empty Redis is refilled from the local snapshot first, when there is one.
+    """
+    if SNAPSHOT_ENABLED and not store.count():
+        restore_snapshot(store)
+        store.ensure_search_index()
+    
+    if store.count():
+        # Decode and index the catalog now instead of on the first request
+        products = get_cached_products()
+        get_filter_index()
+        logger.info(f"🔥 Warm start: {len(products)} products loaded and indexed")
+    
+    metadata = store.get_metadata()
+    if store.count() and is_fresh(metadata):
+        logger.info(f"✅ Catalog is fresh ({catalog_age(metadata) / 60:.0f} min old), skipping startup scrape")
+        return
+    
+    logger.info("🔥 Catalog is missing or stale, queueing automatic product scraping...")
+    job_queue.enqueue("full_scrape", {"pages": FULL_SCRAPE_PAGES})
+
 if __name__ == "__main__":
     initialize_app()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+import redis
+
+from http_scraper import (DEFAULT_API_BASE, DEFAULT_BASE_URL, DEFAULT_PAGE_SIZE, DEFAULT_USER_AGENT,
+                          category_id_from_url, find_product_list, listing_api_params, listing_api_url,
+                          map_listing_items, parse_embedded_state)
+from storage import ProductStore
+from image_cache import default_image_cache
+
+DEFAULT_CATEGORY_URLS = [
+    "https://www.croma.com/televisions-accessories/c/997",
+]
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status, delay=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.delay = delay
+
+
+class HostLimiter:
+    """Per-host concurrency cap plus a minimum spacing between request starts"""
+
+    def __init__(self, concurrency, requests_per_second):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        if self.interval:
+            async with self._lock:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self.interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+
+class AsyncCategoryCrawler:
+    """
+    Crawls many category listings concurrently over HTTP.
+    Requests are limited per host (concurrency and rate), retried with exponential
+    backoff, and every page's products are written to the store as soon as it arrives.
+    """
+
+    def __init__(self, store=None, per_host_concurrency=4, requests_per_second=2.0,
+                 max_retries=3, backoff_base=1.0, timeout=20, page_size=DEFAULT_PAGE_SIZE,
+                 base_url=DEFAULT_BASE_URL, api_base=DEFAULT_API_BASE, user_agent=None):
+        self.store = store
+        self.per_host_concurrency = per_host_concurrency
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.page_size = page_size
+        self.base_url = base_url.rstrip('/')
+        self.api_base = api_base.rstrip('/')
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
+        self._limiters = {}
+        self._store_lock = None
+        self.stats = {"pages": 0, "empty_pages": 0, "failed_pages": 0, "products": 0, "new_products": 0}
+
+    def _limiter(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._limiters:
+            self._limiters[host] = HostLimiter(self.per_host_concurrency, self.requests_per_second)
+        return self._limiters[host]
+
+    async def _get(self, session, url, params=None, as_json=False):
+        """GET with per-host limits and retries; raises after the last attempt"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._limiter(url):
+                    async with session.get(url, params=params) as response:
+                        if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                            retry_after = response.headers.get('Retry-After')
+                            delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+                            raise _RetryableStatus(response.status, delay)
+                        response.raise_for_status()
+                        if as_json:
+                            return await response.json(content_type=None)
+                        return await response.text()
+            except (_RetryableStatus, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = getattr(e, 'delay', None) or self.backoff_base * (2 ** attempt)
+                delay += random.uniform(0, self.backoff_base)
+                print(f"Retrying {url} in {delay:.1f}s ({e})")
+                await asyncio.sleep(delay)
+
+    async def fetch_page(self, session, category_url, page):
+        """Return mapped products for one listing page, API first, embedded state as fallback"""
+        items = []
+        category_id = category_id_from_url(category_url)
+        if category_id:
+            try:
+                data = await self._get(session, listing_api_url(self.api_base, category_id),
+                                       params=listing_api_params(page, self.page_size), as_json=True)
+                items = find_product_list(data)
+            except (aiohttp.ClientError, asyncio.TimeoutError, _RetryableStatus, ValueError) as e:
+                print(f"Listing API failed for {category_url} page {page}: {e}")
+
+        if not items:
+            html = await self._get(session, category_url, params={'page': page} if page else None)
+            items = parse_embedded_state(html)
+
+        return map_listing_items(items, self.base_url)
+
+    async def _store_products(self, products):
+        """Write one page of products to Redis without blocking the event loop"""
+        if not self.store or not products:
+            return 0
+        async with self._store_lock:
+            loop = asyncio.get_running_loop()
+            new_products = await loop.run_in_executor(None, self.store.add_products, products)
+        return len(new_products)
+
+    async def crawl_page(self, session, category_url, page):
+        try:
+            products = await self.fetch_page(session, category_url, page)
+        except Exception as e:
+            self.stats["failed_pages"] += 1
+            print(f"❌ {category_url} page {page} failed: {e}")
+            return []
+
+        self.stats["pages"] += 1
+        if not products:
+            self.stats["empty_pages"] += 1
+            return []
+
+        new_count = await self._store_products(products)
+        self.stats["products"] += len(products)
+        self.stats["new_products"] += new_count
+        print(f"📦 {category_url} page {page}: {len(products)} products ({new_count} new)")
+        return products
+
+    async def crawl(self, category_urls, pages=range(0, 3)):
+        """Crawl every page of every category concurrently; returns all products found"""
+        # asyncio primitives belong to the running loop, so start fresh each crawl
+        self._store_lock = asyncio.Lock()
+        self._limiters = {}
+        headers = {'User-Agent': self.user_agent, 'Accept': 'application/json, text/html;q=0.9, */*;q=0.8'}
+        connector = aiohttp.TCPConnector(limit_per_host=self.per_host_concurrency)
+
+        async with aiohttp.ClientSession(headers=headers, timeout=self.timeout, connector=connector) as session:
+            tasks = [self.crawl_page(session, url, page) for url in category_urls for page in pages]
+            results = await asyncio.gather(*tasks)
+
+        products = []
+        seen_ids = set()
+        for page_products in results:
+            for product in page_products:
+                if product['product_id'] not in seen_ids:
+                    seen_ids.add(product['product_id'])
+                    products.append(product)
+        return products
+
+
+def crawl_categories(category_urls=None, pages=range(0, 3), store=None, **crawler_options):
+    """Synchronous entry point: crawl the given categories and stream products into Redis"""
+    if store is None:
+        redis_client = redis.Redis(host='localhost', port=6379, db=0)
+        store = ProductStore(redis_client, image_cache=default_image_cache(redis_client))
+    crawler = AsyncCategoryCrawler(store=store, **crawler_options)
+
+    started = time.time()
+    products = asyncio.run(crawler.crawl(category_urls or DEFAULT_CATEGORY_URLS, pages))
+    print(f"✅ Crawl finished in {time.time() - started:.1f}s: {crawler.stats}")
+    return products
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl Croma category listings into Redis")
+    parser.add_argument("urls", nargs="*", help="category listing URLs")
+    parser.add_argument("--start-page", type=int, default=0)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent requests per host")
+    parser.add_argument("--rate", type=float, default=2.0, help="requests per second per host")
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args()
+
+    crawl_categories(
+        args.urls or DEFAULT_CATEGORY_URLS,
+        pages=range(args.start_page, args.start_page + args.pages),
+        per_host_concurrency=args.concurrency,
+        requests_per_second=args.rate,
+        max_retries=args.retries,
+    )
@@ -0,0 +1,200 @@
+"""
+Micro-benchmark for listing-page product extraction.
+
+Usage (from backend/):
+    python benchmarks/bench_extraction.py saved_listing.html [more.html ...]
+    python benchmarks/bench_extraction.py --cards 240     # synthetic listing
+
+Save a listing with e.g. `open('listing.html', 'w').write(driver.page_source)`.
+Every backend's output is checked against the original extraction code
+(CromaProductScraper.extract_product_croma before the pluggable parser), kept
+below unchanged apart from the typed numeric fields added since.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from listing_parser import DEFAULT_BASE_URL, PARSER_BACKENDS, ListingParser  # noqa: E402
+from product_fields import normalize_numeric_fields  # noqa: E402
+
+CARD_TEMPLATE = """
+<li class="product-item">
+  <div class="cp-product typ-plp" id="{pid}">
+    <div data-testid="product-img"><img src="https://media.croma.com/image/upload/{pid}.png" alt=""></div>
+    <h3 class="product-title plp-prod-title"><a href="/brand-{i}-tv/p/{pid}">Brand{b} 139 cm (55 inch) 4K Ultra HD LED Smart TV {i}</a></h3>
+    <span class="rating-text-icon"><span class="rating-text">4.{r}</span><span>({reviews})</span></span>
+    <span class="amount" data-testid="new-price">₹{price:,}</span>
+    <span class="old-price" data-testid="old-price">₹{mrp:,}</span>
+    <span class="discount discount-newsearch-plp">{disc}% Off</span>
+    <span class="tagsForPlp">No Cost EMI</span><span class="tagsForPlp">Bank Offer</span>
+    <span class="delivery-text-msg"><span>Standard Delivery by Tomorrow</span></span>
+  </div>
+</li>
+"""
+
+
+def synthetic_listing(cards):
+    """Listing page with `cards` product cards plus some surrounding page weight"""
+    items = []
+    for i in range(cards):
+        price = 20000 + i * 137
+        mrp = price + 5000
+        items.append(CARD_TEMPLATE.format(pid=300000 + i, i=i, b=i % 7, r=i % 10, reviews=i * 3,
+                                          price=price, mrp=mrp, disc=round(5000 * 100 / mrp)))
+    # Recommendation carousel cards outside the product list must not be extracted
+    carousel = "".join(CARD_TEMPLATE.format(pid=900000 + i, i=i, b=i, r=i, reviews=i, price=999, mrp=1999, disc=50)
+                       for i in range(6))
+    filler = "<div class='footer-links'>" + "<a href='/x'>link</a>" * 2000 + "</div>"
+    return (f"<html><head><title>Televisions</title>{'<script>var a=1;</script>' * 50}</head><body>"
+            f"<div id='product-list-back'><ul class='product-list'>{''.join(items)}</ul></div>"
+            f"<div class='recommendations'><ul class='carousel'>{carousel}</ul></div>"
+            f"{filler}</body></html>")
+
+
+def original_extract_product(product_item, index, base_url=DEFAULT_BASE_URL):
+    """CromaProductScraper.extract_product_croma as it was before listing_parser"""
+    product = {}
+
+    try:
+        product_container = product_item.select_one('div.cp-product')
+        if not product_container:
+            return None
+
+        product_id = product_container.get('id')
+        product['product_id'] = product_id or f"croma_product_{index}"
+
+        title_elem = product_item.select_one('h3.product-title a')
+        if title_elem:
+            product['title'] = title_elem.get_text(strip=True)
+            title_words = product['title'].split()
+            if title_words:
+                product['brand'] = title_words[0]
+            else:
+                product['brand'] = 'Croma'
+        else:
+            product['title'] = 'Unknown Product'
+            product['brand'] = 'Croma'
+
+        img_elem = product_item.select_one('div[data-testid="product-img"] img')
+        if img_elem:
+            img_src = img_elem.get('src') or img_elem.get('data-src')
+            if img_src:
+                if img_src.startswith('//'):
+                    img_src = 'https:' + img_src
+                elif img_src.startswith('/'):
+                    img_src = base_url + img_src
+                product['image'] = img_src
+
+        if title_elem and title_elem.get('href'):
+            href = title_elem.get('href')
+            if href.startswith('/'):
+                href = base_url + href
+            product['url'] = href
+
+        rating_elem = product_item.select_one('span.rating-text')
+        if rating_elem:
+            rating_text = rating_elem.get_text(strip=True)
+            if rating_text and re.match(r'^\d+(\.\d+)?$', rating_text):
+                product['rating'] = rating_text
+
+        review_elem = product_item.select_one('span.rating-text-icon span:last-child')
+        if review_elem:
+            review_text = review_elem.get_text(strip=True)
+            review_match = re.search(r'\((\d+)\)', review_text)
+            if review_match:
+                product['review_count'] = review_match.group(1)
+
+        current_price_elem = product_item.select_one('span[data-testid="new-price"]')
+        if current_price_elem:
+            price_text = current_price_elem.get_text(strip=True)
+            product['current_price'] = re.sub(r'\s+', '', price_text)
+
+        original_price_elem = product_item.select_one('span[data-testid="old-price"]')
+        if original_price_elem:
+            product['original_price'] = original_price_elem.get_text(strip=True)
+
+        discount_elem = product_item.select_one('span.discount-newsearch-plp')
+        if discount_elem:
+            product['discount'] = discount_elem.get_text(strip=True)
+
+        offers = []
+        for offer_elem in product_item.select('span.tagsForPlp'):
+            offer_text = offer_elem.get_text(strip=True)
+            if offer_text:
+                offers.append(offer_text)
+        product['offers'] = offers
+
+        delivery_elem = product_item.select_one('span.delivery-text-msg span')
+        if delivery_elem:
+            product['availability'] = delivery_elem.get_text(strip=True)
+        else:
+            product['availability'] = 'Standard Delivery by Tomorrow'
+
+        return product
+
+    except Exception as e:
+        print(f"Error extracting product {index}: {e}")
+        return None
+
+
+def baseline_products(html):
+    """The original extraction path: full html.parser tree, product list preference, per-card extraction"""
+    soup = BeautifulSoup(html, 'html.parser')
+    product_items = soup.select('#product-list-back li.product-item')
+    if not product_items:
+        product_items = soup.select('ul.product-list li.product-item')
+    if not product_items:
+        product_items = soup.select('li.product-item')
+    products = [original_extract_product(item, i + 1) for i, item in enumerate(product_items)]
+    # Typed numeric fields were added to every product after this code was written
+    return [normalize_numeric_fields(p) for p in products if p]
+
+
+def time_run(func, html, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(html)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="saved listing HTML files")
+    parser.add_argument("--cards", type=int, default=120, help="cards in the synthetic listing")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.files:
+        with open(path, encoding='utf-8') as f:
+            pages.append((os.path.basename(path), f.read()))
+    if not pages:
+        pages.append((f"synthetic ({args.cards} cards)", synthetic_listing(args.cards)))
+
+    for name, html in pages:
+        print(f"\n{name}: {len(html) / 1024:.0f} KB")
+        base_time, expected = time_run(baseline_products, html, args.repeat)
+        cards = max(len(expected), 1)
+        print(f"  {'baseline (full tree)':<22} {base_time * 1000:8.2f} ms  {base_time * 1e6 / cards:8.1f} µs/card")
+
+        for backend in PARSER_BACKENDS:
+            listing_parser = ListingParser(backend=backend)
+            if listing_parser.backend != backend:
+                print(f"  {backend:<22} not installed")
+                continue
+            elapsed, products = time_run(listing_parser.parse, html, args.repeat)
+            status = "identical" if products == expected else "OUTPUT DIFFERS"
+            print(f"  {backend:<22} {elapsed * 1000:8.2f} ms  {elapsed * 1e6 / cards:8.1f} µs/card"
+                  f"  x{base_time / elapsed:4.1f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Size benchmark for catalog storage formats.
+
+Usage (from backend/):
+    python benchmarks/bench_storage.py                   # 100k synthetic products
+    python benchmarks/bench_storage.py --products 20000
+    python benchmarks/bench_storage.py --redis           # also measure Redis used_memory
+
+Per-key formats are what ProductStore writes (one value per product:<id>);
+the list formats show the old single-blob layout and the columnar encoding.
+With --redis each per-key format is written under bench:* keys on localhost,
+measured with INFO memory and deleted again.
+"""
+import argparse
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serialization  # noqa: E402
+from serialization import (COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_ZSTD,  # noqa: E402
+                           FORMAT_JSON, FORMAT_MSGPACK)
+from product_fields import normalize_numeric_fields  # noqa: E402
+
+BRANDS = ['Samsung', 'LG', 'Sony', 'Xiaomi', 'OnePlus', 'TCL', 'Croma']
+
+
+def synthetic_catalog(count):
+    """Products shaped like real listing cards"""
+    products = []
+    for i in range(count):
+        price = 15000 + (i * 137) % 150000
+        mrp = price + 2000 + (i * 53) % 30000
+        brand = BRANDS[i % len(BRANDS)]
+        product_id = str(300000 + i)
+        product = {
+            'product_id': product_id,
+            'title': f"{brand} {80 + i % 5 * 27} cm ({32 + i % 5 * 11} inch) 4K Ultra HD LED Smart TV ({i:05d})",
+            'brand': brand,
+            'image': f"https://media.croma.com/image/upload/v1/Croma%20Assets/Entertainment/Television/Images/{product_id}_0_x.png",
+            'url': f"https://www.croma.com/{brand.lower()}-smart-tv/p/{product_id}",
+            'rating': f"{3 + i % 20 / 10:.1f}",
+            'review_count': str(i % 900),
+            'current_price': f"₹{price:,}.00",
+            'original_price': f"₹{mrp:,}.00",
+            'discount': f"{round((mrp - price) * 100 / mrp)}% Off",
+            'offers': ['No Cost EMI', 'Bank Offer'][:1 + i % 2],
+            'availability': 'Standard Delivery by Tomorrow',
+        }
+        products.append(normalize_numeric_fields(product))
+    return products
+
+
+def per_key_formats():
+    formats = [(FORMAT_JSON, COMPRESSION_NONE), (FORMAT_JSON, COMPRESSION_ZLIB)]
+    if serialization.zstandard:
+        formats.append((FORMAT_JSON, COMPRESSION_ZSTD))
+    if serialization.msgpack:
+        formats += [(FORMAT_MSGPACK, COMPRESSION_NONE), (FORMAT_MSGPACK, COMPRESSION_ZLIB)]
+        if serialization.zstandard:
+            formats.append((FORMAT_MSGPACK, COMPRESSION_ZSTD))
+    return formats
+
+
+def redis_used_memory(client, values):
+    """used_memory growth after writing the values under bench:* keys"""
+    keys = [f"bench:{i}" for i in range(len(values))]
+    client.delete(*keys)
+    before = client.info('memory')['used_memory']
+    pipe = client.pipeline(transaction=False)
+    for key, value in zip(keys, values):
+        pipe.set(key, value)
+    pipe.execute()
+    grown = client.info('memory')['used_memory'] - before
+    for start in range(0, len(keys), 10000):
+        client.delete(*keys[start:start + 10000])
+    return grown
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--redis", action="store_true", help="measure Redis memory on localhost:6379")
+    args = parser.parse_args()
+
+    client = None
+    if args.redis:
+        import redis
+        client = redis.Redis(host='localhost', port=6379, db=0)
+
+    products = synthetic_catalog(args.products)
+    print(f"{len(products)} synthetic products\n")
+    print(f"  {'format':<28} {'bytes':>12} {'per product':>12} {'encode':>9} {'decode':>9}"
+          + (f" {'redis memory':>14}" if client else ""))
+
+    def report(name, size, encode_time, decode_time, memory=None):
+        line = (f"  {name:<28} {size / 1024 / 1024:9.1f} MB {size / len(products):10.0f} B"
+                f" {encode_time:8.2f}s {decode_time:8.2f}s")
+        if memory is not None:
+            line += f" {memory / 1024 / 1024:11.1f} MB"
+        print(line)
+
+    for payload_format, compression in per_key_formats():
+        started = time.perf_counter()
+        values = [serialization.encode(p, payload_format, compression) for p in products]
+        encode_time = time.perf_counter() - started
+        started = time.perf_counter()
+        decoded = [serialization.decode(v) for v in values]
+        decode_time = time.perf_counter() - started
+        assert decoded == products
+        memory = redis_used_memory(client, values) if client else None
+        report(f"per key {payload_format}+{compression}", sum(len(v) for v in values),
+               encode_time, decode_time, memory)
+
+    # Whole-catalog layouts, for comparison with the old single "products" blob
+    for name, build, restore in (
+        ("list json", lambda: serialization.encode(products), serialization.decode),
+        ("list json+zlib", lambda: zlib.compress(serialization.encode(products), 6),
+         lambda data: serialization.decode(zlib.decompress(data))),
+        ("columnar json+zlib", lambda: zlib.compress(serialization.encode(serialization.to_columns(products)), 6),
+         lambda data: serialization.from_columns(serialization.decode(zlib.decompress(data)))),
+    ):
+        started = time.perf_counter()
+        blob = build()
+        encode_time = time.perf_counter() - started
+        started = time.perf_counter()
+        assert restore(blob) == products
+        decode_time = time.perf_counter() - started
+        report(name, len(blob), encode_time, decode_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from listing_parser import DEFAULT_AVAILABILITY, DEFAULT_BASE_URL
+from product_fields import normalize_numeric_fields
+
+# Runs the extract_product_croma field rules over li.product-item cards in the page
+# and returns plain objects, so neither the page HTML nor a Python parse is needed.
+# arguments: [0] index of the first card to extract, [1] base URL, [2] default availability
+EXTRACT_PRODUCTS_SCRIPT = r"""
+var start = arguments[0], baseUrl = arguments[1], defaultAvailability = arguments[2];
+
+// Same as BeautifulSoup get_text(strip=True): every text node stripped, then joined
+function strippedText(el) {
+    var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT, null);
+    var parts = [], node;
+    while ((node = walker.nextNode())) {
+        var tag = node.parentNode && node.parentNode.nodeName;
+        if (tag === 'SCRIPT' || tag === 'STYLE' || tag === 'TEMPLATE') { continue; }
+        var text = node.nodeValue.trim();
+        if (text) { parts.push(text); }
+    }
+    return parts.join('');
+}
+
+function textOf(card, selector) {
+    var el = card.querySelector(selector);
+    return el ? strippedText(el) : null;
+}
+
+var cards = Array.prototype.slice.call(document.querySelectorAll('li.product-item'), start);
+var products = [];
+cards.forEach(function (card, offset) {
+    var container = card.querySelector('div.cp-product');
+    if (!container) { return; }
+    var product = {product_id: container.getAttribute('id') || ('croma_product_' + (start + offset + 1))};
+
+    var titleEl = card.querySelector('h3.product-title a');
+    if (titleEl) {
+        product.title = strippedText(titleEl);
+        var words = product.title.split(/\s+/).filter(Boolean);
+        product.brand = words.length ? words[0] : 'Croma';
+    } else {
+        product.title = 'Unknown Product';
+        product.brand = 'Croma';
+    }
+
+    var img = card.querySelector('div[data-testid="product-img"] img');
+    if (img) {
+        var src = img.getAttribute('src') || img.getAttribute('data-src');
+        if (src) {
+            if (src.indexOf('//') === 0) { src = 'https:' + src; }
+            else if (src.charAt(0) === '/') { src = baseUrl + src; }
+            product.image = src;
+        }
+    }
+
+    var href = titleEl ? titleEl.getAttribute('href') : null;
+    if (href) {
+        product.url = href.charAt(0) === '/' ? baseUrl + href : href;
+    }
+
+    var rating = textOf(card, 'span.rating-text');
+    if (rating && /^\d+(\.\d+)?$/.test(rating)) { product.rating = rating; }
+
+    var reviews = textOf(card, 'span.rating-text-icon span:last-child');
+    var reviewMatch = reviews !== null ? /\((\d+)\)/.exec(reviews) : null;
+    if (reviewMatch) { product.review_count = reviewMatch[1]; }
+
+    var price = textOf(card, 'span[data-testid="new-price"]');
+    if (price !== null) { product.current_price = price.replace(/\s+/g, ''); }
+
+    var originalPrice = textOf(card, 'span[data-testid="old-price"]');
+    if (originalPrice !== null) { product.original_price = originalPrice; }
+
+    var discount = textOf(card, 'span.discount-newsearch-plp');
+    if (discount !== null) { product.discount = discount; }
+
+    product.offers = Array.prototype.map.call(card.querySelectorAll('span.tagsForPlp'), strippedText)
+        .filter(function (text) { return text; });
+
+    var delivery = textOf(card, 'span.delivery-text-msg span');
+    product.availability = delivery !== null ? delivery : defaultAvailability;
+
+    products.push(product);
+});
+return products;
+"""
+
+
+def extract_products_in_browser(driver, start=0, base_url=DEFAULT_BASE_URL):
+    """Extract product dicts for cards from index `start` onward with a single execute_script"""
+    products = driver.execute_script(EXTRACT_PRODUCTS_SCRIPT, start, base_url, DEFAULT_AVAILABILITY) or []
+    for product in products:
+        normalize_numeric_fields(product)
+    return products
@@ -0,0 +1,47 @@
+PRODUCT_CARD_SELECTOR = "li.product-item"
+
+# Classifies every <img> inside the cards in [start, end) in one round-trip.
+# Same rules as the old per-element Python loop: a real image has an http/data/
+# image-extension src that does not look like a lazy-load placeholder.
+# `cards` holds one entry per card: whether its product (first) image is real.
+IMAGE_STATUS_SCRIPT = """
+var end = arguments[2] === null ? undefined : arguments[2];
+var cards = Array.prototype.slice.call(document.querySelectorAll(arguments[0]), arguments[1], end);
+var realPattern = /http|data:image|\\.jpg|\\.png|\\.webp/;
+var lazyPattern = /lazy|placeholder|loading/;
+var isReal = function (img) {
+    var src = (img.src || '').toLowerCase();
+    return realPattern.test(src) && !lazyPattern.test(src);
+};
+var result = {real: 0, lazy: 0, cards: []};
+cards.forEach(function (card) {
+    var images = card.querySelectorAll('img');
+    for (var i = 0; i < images.length; i++) {
+        if (isReal(images[i])) { result.real++; } else { result.lazy++; }
+    }
+    result.cards.push(images.length > 0 && isReal(images[0]));
+});
+return result;
+"""
+
+# Same fallback chain as before: data-product-id, then id, then the first link
+PRODUCT_IDS_SCRIPT = """
+var ids = [];
+document.querySelectorAll(arguments[0]).forEach(function (card) {
+    var link = card.querySelector('a');
+    var id = card.getAttribute('data-product-id') || card.getAttribute('id') || (link ? link.href : '');
+    if (id) { ids.push(id); }
+});
+return ids;
+"""
+
+
+def probe_image_status(driver, start=0, end=None):
+    """Return {'real', 'lazy', 'cards'} for the cards in [start, end) with a single execute_script"""
+    status = driver.execute_script(IMAGE_STATUS_SCRIPT, PRODUCT_CARD_SELECTOR, start, end)
+    return status or {'real': 0, 'lazy': 0, 'cards': []}
+
+
+def probe_product_ids(driver):
+    """Return the identifiers of every product card on the page with a single execute_script"""
+    return driver.execute_script(PRODUCT_IDS_SCRIPT, PRODUCT_CARD_SELECTOR) or []
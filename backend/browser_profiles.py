@@ -0,0 +1,62 @@
+import os
+
+# Resource-blocking profiles for scraping browsers:
+#   full   - load everything (the old behaviour)
+#   images - product images load; fonts, media, ads, analytics and trackers are blocked
+#   data   - images are blocked too; image URLs are read from the lazy-loader attributes
+PROFILE_FULL = "full"
+PROFILE_IMAGES = "images"
+PROFILE_DATA = "data"
+
+DEFAULT_PROFILE = os.environ.get("SCRAPER_RESOURCE_PROFILE", PROFILE_IMAGES)
+
+# Network.setBlockedURLs patterns; '*' matches any run of characters
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*fonts.googleapis.com*", "*fonts.gstatic.com*"]
+
+MEDIA_PATTERNS = ["*.mp4", "*.webm", "*.m3u8", "*youtube.com/embed*", "*ytimg.com*"]
+
+THIRD_PARTY_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*googleadservices.com*", "*googlesyndication.com*",
+    "*doubleclick.net*", "*connect.facebook.net*", "*facebook.com/tr*", "*analytics.twitter.com*",
+    "*hotjar.com*", "*clarity.ms*", "*criteo.*", "*taboola.com*", "*outbrain.com*", "*moengage.com*",
+    "*branch.io*", "*nr-data.net*", "*newrelic.com*", "*appsflyer.com*", "*adobedtm.com*", "*omtrdc.net*",
+    "*demdex.net*", "*bing.com/bat*", "*snapchat.com*", "*licdn.com*",
+]
+
+IMAGE_PATTERNS = ["*.png*", "*.jpg*", "*.jpeg*", "*.webp*", "*.gif*", "*.svg*", "*.avif*", "*.ico*"]
+
+BLOCKED_URL_PATTERNS = {
+    PROFILE_FULL: [],
+    PROFILE_IMAGES: FONT_PATTERNS + MEDIA_PATTERNS + THIRD_PARTY_PATTERNS,
+    PROFILE_DATA: FONT_PATTERNS + MEDIA_PATTERNS + THIRD_PARTY_PATTERNS + IMAGE_PATTERNS,
+}
+
+
+def resolve_profile(profile):
+    profile = profile or DEFAULT_PROFILE
+    if profile not in BLOCKED_URL_PATTERNS:
+        raise ValueError(f"Unknown resource profile '{profile}'. Use one of: {', '.join(BLOCKED_URL_PATTERNS)}")
+    return profile
+
+
+def configure_options(chrome_options, profile):
+    """Chrome flags for a profile, applied before the browser starts"""
+    if profile == PROFILE_DATA:
+        # The renderer skips image decoding as well; lazy loaders still set src attributes
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    return chrome_options
+
+
+def apply_blocking(driver, profile):
+    """Install the profile's URL blocklist on the driver's tab through DevTools"""
+    patterns = BLOCKED_URL_PATTERNS[profile]
+    if not patterns:
+        return True
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        return True
+    except Exception as e:
+        print(f"Could not install '{profile}' request blocking: {e}")
+        return False
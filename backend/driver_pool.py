@@ -0,0 +1,123 @@
+import atexit
+import threading
+import time
+
+
+class DriverPool:
+    """
+    Bounded pool of warm Selenium drivers.
+    Drivers are reused across scrapes so Chrome startup is paid once, health-checked
+    before each use, wiped (cookies, storage) between jobs and recycled after
+    `max_uses` jobs. Recycled drivers come from `factory`, which picks a new random
+    user agent, so the UA rotates on every recycle.
+    """
+
+    def __init__(self, factory, max_size=2, max_uses=25, acquire_timeout=300):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._uses = {}
+        atexit.register(self.close_all)
+
+    def acquire(self):
+        """Check out a healthy driver, or None if none could be created"""
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            print(f"Timed out after {self.acquire_timeout}s waiting for a free browser")
+            return None
+
+        while True:
+            with self._lock:
+                driver = self._idle.pop() if self._idle else None
+            if driver is None:
+                break
+            if self.is_healthy(driver):
+                return driver
+            print("♻️ Discarding unhealthy browser session")
+            self._quit(driver)
+
+        started = time.time()
+        driver = self.factory()
+        if driver is None:
+            self._slots.release()
+            return None
+        print(f"🌐 Started new browser session in {time.time() - started:.1f}s")
+        with self._lock:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def release(self, driver, discard=False):
+        """Return a driver to the pool; it is quit instead if broken or worn out"""
+        if driver is None:
+            return
+        try:
+            with self._lock:
+                uses = self._uses.get(id(driver), 0) + 1
+                self._uses[id(driver)] = uses
+
+            if discard or uses >= self.max_uses:
+                print(f"♻️ Recycling browser session after {uses} uses")
+                self._quit(driver)
+            elif self._reset(driver):
+                with self._lock:
+                    self._idle.append(driver)
+            else:
+                self._quit(driver)
+        finally:
+            self._slots.release()
+
+    def warm_up(self, count=1):
+        """Start `count` drivers ahead of the first scrape"""
+        drivers = []
+        for _ in range(min(count, self.max_size)):
+            driver = self.acquire()
+            if driver:
+                drivers.append(driver)
+        for driver in drivers:
+            self.release(driver)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._quit(driver)
+
+    def is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1;") == 1 and len(driver.window_handles) >= 1
+        except Exception:
+            return False
+
+    def _reset(self, driver):
+        """Clear session state so the next job starts from a clean browser"""
+        try:
+            # Close any extra tabs a job may have opened
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            # Storage is per-origin, so clear it before leaving the page
+            driver.execute_script("try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}")
+            try:
+                # Keeps the HTTP cache warm; only session state is dropped
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except Exception:
+                driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"Error resetting browser session: {e}")
+            return False
+
+    def _quit(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
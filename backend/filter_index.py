@@ -0,0 +1,90 @@
+from bisect import bisect_left, bisect_right
+from product_fields import numeric_fields
+
+# Query parameter name -> numeric product field
+SORT_FIELDS = {
+    'price': 'price_paise',
+    'rating': 'rating_value',
+    'discount': 'discount_percent',
+}
+
+
+class FilterIndex:
+    """
+    Precomputed indexes over a decoded catalog.
+    Numeric fields are kept as sorted (value, position) arrays so range queries
+    are two bisects, and brands map to position sets; a query intersects the
+    matching position sets, smallest first.
+    """
+
+    def __init__(self, products):
+        self.products = products
+        self.sorted_values = {}
+        self.sorted_positions = {}
+        self.brands = {}
+
+        columns = {field: [] for field in SORT_FIELDS.values()}
+        for position, product in enumerate(products):
+            # Catalogs stored before typed fields existed are normalized here
+            values = product if 'price_paise' in product else numeric_fields(product)
+            for field, column in columns.items():
+                value = values.get(field)
+                if value is not None:
+                    column.append((value, position))
+
+            brand = (product.get('brand') or '').strip().lower()
+            self.brands.setdefault(brand, set()).add(position)
+
+        for field, column in columns.items():
+            column.sort()
+            self.sorted_values[field] = [value for value, _ in column]
+            self.sorted_positions[field] = [position for _, position in column]
+
+    def range_positions(self, field, low=None, high=None):
+        """Positions whose field value lies in [low, high]; products without a value never match"""
+        values = self.sorted_values[field]
+        start = bisect_left(values, low) if low is not None else 0
+        end = bisect_right(values, high) if high is not None else len(values)
+        return set(self.sorted_positions[field][start:end])
+
+    def query(self, brand=None, min_price=None, max_price=None, min_rating=None,
+              min_discount=None, sort=None, descending=False):
+        """Return matching product positions, in catalog order unless `sort` is given"""
+        candidate_sets = []
+        if brand:
+            candidate_sets.append(self.brands.get(brand.strip().lower(), set()))
+        if min_price is not None or max_price is not None:
+            candidate_sets.append(self.range_positions('price_paise', min_price, max_price))
+        if min_rating is not None:
+            candidate_sets.append(self.range_positions('rating_value', min_rating))
+        if min_discount is not None:
+            candidate_sets.append(self.range_positions('discount_percent', min_discount))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            matches = set(candidate_sets[0])
+            for positions in candidate_sets[1:]:
+                matches &= positions
+                if not matches:
+                    break
+        else:
+            matches = None
+
+        in_catalog_order = list(range(len(self.products))) if matches is None else sorted(matches)
+        if sort not in SORT_FIELDS:
+            return in_catalog_order
+
+        # Walk the presorted array instead of sorting the result set
+        ordered = self.sorted_positions[SORT_FIELDS[sort]]
+        if descending:
+            ordered = reversed(ordered)
+        result = [p for p in ordered if matches is None or p in matches]
+
+        # Products without a value for the sort field go last
+        if len(result) < len(in_catalog_order):
+            sorted_set = set(result)
+            result.extend(p for p in in_catalog_order if p not in sorted_set)
+        return result
+
+    def get_products(self, positions):
+        return [self.products[p] for p in positions]
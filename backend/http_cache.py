@@ -0,0 +1,84 @@
+import hashlib
+import zlib
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this are sent as is; compression would not pay off
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/x-ndjson')
+
+
+def make_etag(*parts):
+    """Digest of everything a response body depends on"""
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()[:20]
+
+
+def to_http_date(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc) if timestamp else None
+
+
+def is_not_modified(request, etag, last_modified=None):
+    """
+    Conditional GET check. If-None-Match wins when present (weak comparison);
+    otherwise If-Modified-Since is compared with the second-resolution Last-Modified.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified and request.if_modified_since:
+        return int(last_modified.timestamp()) <= int(request.if_modified_since.timestamp())
+    return False
+
+
+def choose_encoding(request):
+    """Best encoding the client accepts: br when brotli is installed, else gzip"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compressor(encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=5)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    return compressor.compress, compressor.flush
+
+
+def _compress_stream(chunks, encoding):
+    process, finish = _compressor(encoding)
+    for chunk in chunks:
+        data = process(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def compress_response(request, response):
+    """gzip/brotli-encode a JSON response, including streamed ones, chunk by chunk"""
+    if (response.status_code != 200 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+
+    encoding = choose_encoding(request)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return response
+        process, finish = _compressor(encoding)
+        response.set_data(process(data) + finish())
+    response.headers['Content-Encoding'] = encoding
+    return response
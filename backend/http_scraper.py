@@ -0,0 +1,282 @@
+import json
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from product_fields import normalize_numeric_fields
+
+DEFAULT_BASE_URL = "https://www.croma.com"
+DEFAULT_API_BASE = "https://api.croma.com"
+CATEGORY_API_PATH = "/searchservices/v1/category/{category_id}"
+DEFAULT_PAGE_SIZE = 24
+DEFAULT_AVAILABILITY = 'Standard Delivery by Tomorrow'
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+_CATEGORY_ID_RE = re.compile(r'/c/(\d+)')
+_INITIAL_STATE_RE = re.compile(r'window\.__INITIAL_STATE__\s*=\s*(\{.*?\})\s*;?\s*</script>', re.S)
+_NEXT_DATA_RE = re.compile(r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+
+def retrying_session(headers=None):
+    """Pooled requests.Session that retries GETs on throttling and server errors"""
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=['GET'])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def category_id_from_url(url):
+    """'/televisions-accessories/c/997' -> '997'"""
+    match = _CATEGORY_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def format_rupees(value):
+    """Format a number the way Croma displays prices: ₹1,25,999 (Indian digit grouping)"""
+    rupees = int(round(float(value)))
+    digits = str(rupees)
+    if len(digits) > 3:
+        head, tail = digits[:-3], digits[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        if head:
+            groups.insert(0, head)
+        digits = ','.join(groups + [tail])
+    return f"₹{digits}"
+
+
+def _price_text(value):
+    """Croma price objects carry formattedValue and/or value"""
+    if isinstance(value, dict):
+        if value.get('formattedValue'):
+            return re.sub(r'\s+', '', value['formattedValue'])
+        value = value.get('value')
+    if value in (None, ''):
+        return None
+    if isinstance(value, str):
+        return re.sub(r'\s+', '', value)
+    return format_rupees(value)
+
+
+def _normalize_url(url, base_url):
+    if not url:
+        return None
+    if url.startswith('//'):
+        return 'https:' + url
+    if url.startswith('/'):
+        return base_url + url
+    return url
+
+
+def _looks_like_product_list(value):
+    return (isinstance(value, list) and value and isinstance(value[0], dict)
+            and 'code' in value[0] and 'name' in value[0])
+
+
+def find_product_list(state):
+    """Walk a decoded JSON state tree and return the first list of product objects"""
+    stack = [state]
+    while stack:
+        node = stack.pop()
+        if _looks_like_product_list(node):
+            return node
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+    return []
+
+
+def product_from_listing_item(item, base_url=DEFAULT_BASE_URL):
+    """Map one listing JSON object to the same dict shape extract_product_croma produces"""
+    product = {'product_id': str(item.get('code'))}
+
+    title = (item.get('name') or '').strip()
+    if title:
+        product['title'] = title
+        # Same rule as the HTML extractor: brand is the first word of the title
+        product['brand'] = title.split()[0]
+    else:
+        product['title'] = 'Unknown Product'
+        product['brand'] = 'Croma'
+
+    image = item.get('plpImage')
+    if not image and item.get('images'):
+        first = item['images'][0]
+        image = first.get('url') if isinstance(first, dict) else first
+    image = _normalize_url(image, base_url)
+    if image:
+        product['image'] = image
+
+    url = _normalize_url(item.get('url'), base_url)
+    if url:
+        product['url'] = url
+
+    rating = item.get('averageRating', item.get('finalReviewRating'))
+    if rating not in (None, ''):
+        rating_text = f"{float(rating):g}" if not isinstance(rating, str) else rating.strip()
+        if re.match(r'^\d+(\.\d+)?$', rating_text):
+            product['rating'] = rating_text
+
+    reviews = item.get('numberOfRatings', item.get('numberOfReviews'))
+    if reviews not in (None, ''):
+        product['review_count'] = str(reviews)
+
+    current_price = _price_text(item.get('price'))
+    if current_price:
+        product['current_price'] = current_price
+
+    original_price = _price_text(item.get('mrp'))
+    if original_price:
+        product['original_price'] = original_price
+
+    discount = item.get('discountValue')
+    if discount not in (None, '', 0, '0'):
+        product['discount'] = f"{discount}% Off" if not str(discount).endswith('%') else f"{discount} Off"
+
+    offers = []
+    for offer in item.get('plpOffers') or item.get('offerTags') or []:
+        text = offer.get('description') if isinstance(offer, dict) else offer
+        if text:
+            offers.append(str(text).strip())
+    product['offers'] = offers
+
+    product['availability'] = item.get('deliveryMessage') or DEFAULT_AVAILABILITY
+
+    normalize_numeric_fields(product)
+    return product
+
+
+def parse_embedded_state(html):
+    """Return the raw product objects from the state JSON embedded in listing HTML"""
+    for pattern in (_INITIAL_STATE_RE, _NEXT_DATA_RE):
+        match = pattern.search(html)
+        if not match:
+            continue
+        try:
+            state = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+        items = find_product_list(state)
+        if items:
+            return items
+    return []
+
+
+def listing_api_params(page, page_size=DEFAULT_PAGE_SIZE):
+    return {
+        'currentPage': page,
+        'pageSize': page_size,
+        'query': ':relevance',
+        'fields': 'FULL',
+        'channel': 'WEB',
+    }
+
+
+def listing_api_url(api_base, category_id):
+    return api_base.rstrip('/') + CATEGORY_API_PATH.format(category_id=category_id)
+
+
+def map_listing_items(items, base_url=DEFAULT_BASE_URL):
+    """Map raw listing objects to product dicts, skipping items without a code"""
+    products = []
+    for item in items:
+        if not item.get('code'):
+            continue
+        try:
+            products.append(product_from_listing_item(item, base_url))
+        except Exception as e:
+            print(f"Error mapping listing item {item.get('code')}: {e}")
+    return products
+
+
+class CromaHttpScraper:
+    """
+    Browser-free listing scraper.
+    Reads the category listing API (falling back to the state JSON embedded in the
+    listing HTML) over a pooled requests.Session. Base URLs are configurable so it
+    can be pointed at recorded fixture responses served locally.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, api_base=DEFAULT_API_BASE,
+                 page_size=DEFAULT_PAGE_SIZE, timeout=15, user_agent=None):
+        self.base_url = base_url.rstrip('/')
+        self.api_base = api_base.rstrip('/')
+        self.page_size = page_size
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+        self.session = retrying_session({
+            'User-Agent': user_agent or DEFAULT_USER_AGENT,
+            'Accept': 'application/json, text/html;q=0.9, */*;q=0.8',
+            'Accept-Language': 'en-IN,en;q=0.9',
+        })
+
+    def config(self):
+        """Constructor arguments for an equivalent scraper, e.g. in a worker process"""
+        return {'base_url': self.base_url, 'api_base': self.api_base, 'page_size': self.page_size,
+                'timeout': self.timeout, 'user_agent': self.user_agent}
+
+    def fetch_api_page(self, category_id, page=0):
+        """Fetch one page of the category listing API; returns raw product objects"""
+        response = self.session.get(
+            listing_api_url(self.api_base, category_id),
+            params=listing_api_params(page, self.page_size),
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return find_product_list(response.json())
+
+    def fetch_embedded_state_page(self, url, page=0):
+        """Fetch the listing HTML and read products from its embedded state JSON"""
+        params = {'page': page} if page else None
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return self.parse_embedded_state(response.text)
+
+    def parse_embedded_state(self, html):
+        return parse_embedded_state(html)
+
+    def fetch_listing_page(self, url, page=0):
+        """Return mapped products for one listing page, trying the API first"""
+        items = []
+        category_id = category_id_from_url(url)
+        if category_id:
+            try:
+                items = self.fetch_api_page(category_id, page)
+            except (requests.RequestException, ValueError) as e:
+                print(f"Listing API failed for page {page}: {e}")
+
+        if not items:
+            try:
+                items = self.fetch_embedded_state_page(url, page)
+            except requests.RequestException as e:
+                print(f"Listing HTML fetch failed for page {page}: {e}")
+
+        return map_listing_items(items, self.base_url)
+
+    def scrape(self, url, pages=1, start_page=0):
+        """Scrape `pages` consecutive listing pages, stopping early at an empty page"""
+        products = []
+        seen_ids = set()
+        for page in range(start_page, start_page + pages):
+            page_products = self.fetch_listing_page(url, page)
+            if not page_products:
+                break
+            for product in page_products:
+                if product['product_id'] not in seen_ids:
+                    seen_ids.add(product['product_id'])
+                    products.append(product)
+        print(f"HTTP fast path: {len(products)} products from {url}")
+        return products
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,196 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_scraper import retrying_session
+from serialization import to_str
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "croma-image-cache"))
+DEFAULT_MAX_BYTES = int(os.environ.get("IMAGE_CACHE_MAX_MB", "200")) * 1024 * 1024
+IMAGE_CACHE_ENABLED = os.environ.get("IMAGE_CACHE", "1") != "0"
+
+# url key -> original image URL, and url key -> cached file name
+IMAGE_SOURCES_KEY = "images:sources"
+IMAGE_FILES_KEY = "images:files"
+
+LOCAL_IMAGE_PREFIX = "/images/"
+THUMBNAIL_SIZE = (400, 400)
+
+_KEY_RE = re.compile(r'^[0-9a-f]{20}$')
+_EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/webp': '.webp', 'image/gif': '.gif',
+               'image/avif': '.avif', 'image/svg+xml': '.svg'}
+_MIMETYPES = {ext: mimetype for mimetype, ext in _EXTENSIONS.items()}
+
+
+def image_key(url):
+    """Stable key for a source image URL, used in /images/<key>"""
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:20]
+
+
+def is_valid_key(key):
+    return bool(_KEY_RE.match(key or ''))
+
+
+class ImageCache:
+    """
+    On-disk thumbnail cache for product images.
+    Product `image` fields point at /images/<key>; the first request fetches the
+    source once over a pooled session, stores a resized thumbnail under its
+    content hash, and later requests are served from disk. The least recently
+    served files are evicted once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, redis_client, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 thumbnail_size=THUMBNAIL_SIZE, timeout=10):
+        self.redis = redis_client
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.thumbnail_size = thumbnail_size
+        self.timeout = timeout
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.session = retrying_session({'Accept': 'image/avif,image/webp,image/*;q=0.8'})
+
+        self._lock = threading.Lock()
+        self._total_bytes = sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.is_file())
+
+    def localize(self, products):
+        """
+        Point product images at the local cache, keeping the CDN URL in image_source.
+        Returns the products, rewritten in place.
+        """
+        sources = {}
+        for product in products:
+            source = product.get('image_source') or product.get('image')
+            if not source or source.startswith(LOCAL_IMAGE_PREFIX):
+                continue
+            key = image_key(source)
+            sources[key] = source
+            product['image_source'] = source
+            product['image'] = f"{LOCAL_IMAGE_PREFIX}{key}"
+        if sources:
+            self.redis.hset(IMAGE_SOURCES_KEY, mapping=sources)
+        return products
+
+    def path_for(self, key):
+        """Cached file path for a key, or None when it is not on disk"""
+        filename = to_str(self.redis.hget(IMAGE_FILES_KEY, key))
+        if not filename:
+            return None
+        path = os.path.join(self.cache_dir, filename)
+        return path if os.path.exists(path) else None
+
+    def get(self, key):
+        """
+        Return (path, mimetype) for a key, fetching the source on a miss.
+        None when the key is unknown or the source cannot be fetched.
+        """
+        path = self.path_for(key)
+        if path is None:
+            source = to_str(self.redis.hget(IMAGE_SOURCES_KEY, key))
+            if not source:
+                return None
+            path = self.fetch(key, source)
+            if path is None:
+                return None
+        try:
+            # Serving refreshes the file's position in the LRU order
+            os.utime(path)
+        except OSError:
+            pass
+        return path, _MIMETYPES.get(os.path.splitext(path)[1], 'application/octet-stream')
+
+    def fetch(self, key, source):
+        """Download, resize and store one image; returns its path or None"""
+        try:
+            response = self.session.get(source, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"Image fetch failed for {source}: {e}")
+            return None
+
+        mimetype = response.headers.get('Content-Type', '').split(';')[0].strip()
+        data, extension = self._thumbnail(response.content, _EXTENSIONS.get(mimetype, '.img'))
+
+        # Content-addressed: identical images from different URLs share one file
+        filename = hashlib.sha1(data).hexdigest() + extension
+        path = os.path.join(self.cache_dir, filename)
+        if not os.path.exists(path):
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            with self._lock:
+                self._total_bytes += len(data)
+        self.redis.hset(IMAGE_FILES_KEY, key, filename)
+        self._evict()
+        return path
+
+    def _thumbnail(self, data, extension):
+        """Resize to fit thumbnail_size; the original bytes are kept without Pillow or for SVG/GIF"""
+        if Image is None or extension in ('.svg', '.gif'):
+            return data, extension
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                if image.width <= self.thumbnail_size[0] and image.height <= self.thumbnail_size[1]:
+                    return data, extension
+                image.thumbnail(self.thumbnail_size)
+                output = io.BytesIO()
+                image.save(output, format='WEBP', quality=80)
+                return output.getvalue(), '.webp'
+        except Exception as e:
+            logger.warning(f"Could not resize image, storing original: {e}")
+            return data, extension
+
+    def _evict(self):
+        """Delete least recently served files until the cache is back under 90% of max_bytes"""
+        with self._lock:
+            if self._total_bytes <= self.max_bytes:
+                return
+            entries = sorted((entry for entry in os.scandir(self.cache_dir)
+                              if entry.is_file() and not entry.name.endswith('.tmp')),
+                             key=lambda entry: entry.stat().st_mtime)
+            target = self.max_bytes * 0.9
+            for entry in entries:
+                if self._total_bytes <= target:
+                    break
+                try:
+                    size = entry.stat().st_size
+                    os.remove(entry.path)
+                    self._total_bytes -= size
+                except OSError:
+                    continue
+            logger.info(f"Image cache trimmed to {self._total_bytes / 1024 / 1024:.1f} MB")
+
+    def prefetch(self, products, max_workers=4):
+        """Warm the cache for the given (localized) products; returns how many were fetched"""
+        pending = []
+        for product in products:
+            image = product.get('image') or ''
+            key = image[len(LOCAL_IMAGE_PREFIX):] if image.startswith(LOCAL_IMAGE_PREFIX) else None
+            if key and product.get('image_source') and self.path_for(key) is None:
+                pending.append((key, product['image_source']))
+        if not pending:
+            return 0
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            fetched = list(pool.map(lambda item: self.fetch(*item), pending))
+        return sum(1 for path in fetched if path)
+
+
+def default_image_cache(redis_client):
+    """The shared image cache, or None when disabled with IMAGE_CACHE=0"""
+    return ImageCache(redis_client) if IMAGE_CACHE_ENABLED else None
@@ -0,0 +1,124 @@
+from browser_probes import PRODUCT_CARD_SELECTOR
+from listing_parser import DEFAULT_BASE_URL
+
+# Derives each card's final image URL without scrolling it into view, from (in order)
+# a usable src, the lazy-loader attributes, the largest srcset / <picture> candidate,
+# a <noscript> fallback, then the product list embedded in the page state.
+# Cards are keyed by the same product_id the extractor uses.
+# arguments: [0] card selector, [1] first card, [2] end (null = all), [3] base URL
+RESOLVE_IMAGES_SCRIPT = r"""
+var cards = Array.prototype.slice.call(document.querySelectorAll(arguments[0]), arguments[1],
+                                       arguments[2] === null ? undefined : arguments[2]);
+var start = arguments[1], baseUrl = arguments[3];
+var placeholder = /lazy|placeholder|loading|^data:/i;
+
+function absolute(url) {
+    if (!url) { return null; }
+    url = url.trim();
+    if (!url || placeholder.test(url)) { return null; }
+    if (url.indexOf('//') === 0) { return 'https:' + url; }
+    if (url.charAt(0) === '/') { return baseUrl + url; }
+    return /^https?:/i.test(url) ? url : null;
+}
+
+// "a.png 320w, b.png 640w" -> b.png
+function largest(srcset) {
+    var best = null, bestSize = -1;
+    (srcset || '').split(',').forEach(function (entry) {
+        var parts = entry.trim().split(/\s+/);
+        if (!parts[0]) { return; }
+        var size = parts[1] ? parseFloat(parts[1]) || 0 : 1;
+        if (size > bestSize) { best = parts[0]; bestSize = size; }
+    });
+    return best;
+}
+
+// code -> image from the page's embedded product list, built once per page
+function embeddedImages() {
+    if (window.__scraperEmbeddedImages) { return window.__scraperEmbeddedImages; }
+    var map = {}, state = window.__INITIAL_STATE__ || null;
+    if (!state) {
+        var next = document.getElementById('__NEXT_DATA__');
+        try { state = next ? JSON.parse(next.textContent) : null; } catch (e) { state = null; }
+    }
+    var stack = state ? [state] : [], visited = 0;
+    while (stack.length && visited < 200000) {
+        var node = stack.pop();
+        visited++;
+        if (Array.isArray(node)) {
+            if (node.length && node[0] && typeof node[0] === 'object' && 'code' in node[0] && 'name' in node[0]) {
+                node.forEach(function (item) {
+                    var image = item.plpImage || (item.images && item.images.length
+                        ? (typeof item.images[0] === 'object' ? item.images[0].url : item.images[0]) : null);
+                    if (item.code && image) { map[String(item.code)] = image; }
+                });
+            }
+            node.forEach(function (child) { if (child && typeof child === 'object') { stack.push(child); } });
+        } else if (node && typeof node === 'object') {
+            for (var key in node) {
+                if (node[key] && typeof node[key] === 'object') { stack.push(node[key]); }
+            }
+        }
+    }
+    window.__scraperEmbeddedImages = map;
+    return map;
+}
+
+var images = {}, unresolved = [];
+cards.forEach(function (card, offset) {
+    var container = card.querySelector('div.cp-product');
+    if (!container) { return; }
+    var productId = container.getAttribute('id') || ('croma_product_' + (start + offset + 1));
+    var img = card.querySelector('div[data-testid="product-img"] img') || card.querySelector('img');
+    var candidates = [];
+    if (img) {
+        candidates.push(img.getAttribute('src'), img.getAttribute('data-src'), img.getAttribute('data-lazy-src'),
+                        img.getAttribute('data-original'), largest(img.getAttribute('data-srcset')),
+                        largest(img.getAttribute('srcset')));
+        var picture = img.closest('picture');
+        if (picture) {
+            picture.querySelectorAll('source').forEach(function (source) {
+                candidates.push(largest(source.getAttribute('srcset') || source.getAttribute('data-srcset')));
+            });
+        }
+    }
+    var noscript = card.querySelector('noscript');
+    if (noscript) {
+        var match = /<img[^>]+src=["']([^"']+)["']/i.exec(noscript.textContent);
+        if (match) { candidates.push(match[1]); }
+    }
+    var url = null;
+    for (var i = 0; i < candidates.length && !url; i++) { url = absolute(candidates[i]); }
+    if (!url) { url = absolute(embeddedImages()[productId]); }
+    if (url) { images[productId] = url; } else { unresolved.push(start + offset); }
+});
+return {images: images, unresolved: unresolved};
+"""
+
+SCROLL_TO_CARD_SCRIPT = """
+var card = document.querySelectorAll(arguments[0])[arguments[1]];
+if (card) { card.scrollIntoView({block: 'center'}); }
+return !!card;
+"""
+
+
+def resolve_image_urls(driver, start=0, end=None, base_url=DEFAULT_BASE_URL):
+    """
+    Return ({product_id: image_url}, [indices of cards whose URL could not be derived])
+    for the cards in [start, end) with a single execute_script and no scrolling.
+    """
+    result = driver.execute_script(RESOLVE_IMAGES_SCRIPT, PRODUCT_CARD_SELECTOR, start, end, base_url) or {}
+    return result.get('images') or {}, result.get('unresolved') or []
+
+
+def scroll_card_into_view(driver, index):
+    return driver.execute_script(SCROLL_TO_CARD_SCRIPT, PRODUCT_CARD_SELECTOR, index)
+
+
+def apply_images(products, images):
+    """Replace extracted (possibly placeholder) image URLs with the resolved ones"""
+    for product in products:
+        url = images.get(product['product_id'])
+        if url:
+            product['image'] = url
+    return products
@@ -0,0 +1,230 @@
+import json
+import time
+import uuid
+
+from serialization import to_str
+
+JOB_QUEUE_KEY = "scrape:jobs:queue"
+# Jobs a worker has taken off the queue but not finished; recovered if the worker dies
+JOB_PROCESSING_KEY = "scrape:jobs:processing"
+JOB_KEY_PREFIX = "scrape:job:"
+ACTIVE_JOB_KEY_PREFIX = "scrape:jobs:active:"
+SCRAPE_LOCK_KEY = "scrape:lock"
+
+# Finished jobs are kept around for status polling, then expire
+JOB_TTL_SECONDS = 24 * 3600
+# A dequeued job that has not started running after this long lost its worker
+STALE_DEQUEUE_SECONDS = 120
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# Deletes the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Points a job type's active marker at a new job only if it still names the job we inspected
+_REPLACE_ACTIVE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return false
+"""
+
+# Extends the lock only if we still own it
+_EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class RedisLock:
+    """
+    Distributed lock (SET NX PX with an owner token) shared by every API and worker
+    process. It expires on its own if the holder dies; long jobs call extend().
+    """
+
+    def __init__(self, redis_client, key=SCRAPE_LOCK_KEY, ttl_seconds=600):
+        self.redis = redis_client
+        self.key = key
+        self.ttl_ms = int(ttl_seconds * 1000)
+        self.token = None
+
+    def acquire(self, blocking=False, timeout=None, poll_interval=0.5):
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            if self.redis.set(self.key, token, nx=True, px=self.ttl_ms):
+                self.token = token
+                return True
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            time.sleep(poll_interval)
+
+    def extend(self):
+        if not self.token:
+            return False
+        return bool(self.redis.eval(_EXTEND_SCRIPT, 1, self.key, self.token, self.ttl_ms))
+
+    def release(self):
+        if not self.token:
+            return False
+        released = bool(self.redis.eval(_RELEASE_SCRIPT, 1, self.key, self.token))
+        self.token = None
+        return released
+
+    def locked(self):
+        return bool(self.redis.exists(self.key))
+
+
+class JobQueue:
+    """
+    Redis-backed scrape job queue.
+    Jobs are hashes (scrape:job:<id>) holding status, progress and result; their ids
+    are pushed on a list that worker processes move to a processing list with BLMOVE,
+    so a job whose worker dies is not lost. Only one queued or running job per type
+    is kept, so repeated clicks share the same job.
+    """
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    def job_key(self, job_id):
+        return f"{JOB_KEY_PREFIX}{job_id}"
+
+    def enqueue(self, job_type, params=None):
+        """Queue a job and return its id, or the id of the job of this type already pending"""
+        active_key = f"{ACTIVE_JOB_KEY_PREFIX}{job_type}"
+        job_id = uuid.uuid4().hex
+
+        while not self.redis.set(active_key, job_id, nx=True, ex=JOB_TTL_SECONDS):
+            existing_id = to_str(self.redis.get(active_key))
+            if not existing_id:
+                # The marker expired in between; try to claim it again
+                continue
+            existing = self.get(existing_id)
+            pending = existing and existing["status"] in (JOB_QUEUED, JOB_RUNNING)
+            if pending and not self.is_stale(existing):
+                return existing_id, False
+            # Stale marker from a finished, expired or dead job. Another process may be
+            # replacing it too; only the one whose compare-and-set succeeds queues a job.
+            if not self.redis.eval(_REPLACE_ACTIVE_SCRIPT, 1, active_key, existing_id, job_id, JOB_TTL_SECONDS):
+                continue
+            if pending:
+                # Its worker died; fail it so pollers stop waiting
+                self.finish(existing_id, job_type, JOB_FAILED, error="The scrape worker stopped unexpectedly")
+            break
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self.job_key(job_id), mapping={
+            "id": job_id,
+            "type": job_type,
+            "status": JOB_QUEUED,
+            "progress": "Waiting for a scrape worker",
+            "params": json.dumps(params or {}),
+            "created_at": time.time(),
+        })
+        pipe.expire(self.job_key(job_id), JOB_TTL_SECONDS)
+        pipe.rpush(JOB_QUEUE_KEY, job_id)
+        pipe.execute()
+        return job_id, True
+
+    def is_active(self, job_type):
+        """True while a live job of this type is queued or running"""
+        job_id = to_str(self.redis.get(f"{ACTIVE_JOB_KEY_PREFIX}{job_type}"))
+        job = self.get(job_id) if job_id else None
+        return bool(job) and job["status"] in (JOB_QUEUED, JOB_RUNNING) and not self.is_stale(job)
+
+    def dequeue(self, timeout=5):
+        """
+        Block up to `timeout` seconds for the next job; returns the job dict or None.
+        The id stays on the processing list until the job is finished or requeued.
+        """
+        job_id = to_str(self.redis.blmove(JOB_QUEUE_KEY, JOB_PROCESSING_KEY, timeout, "LEFT", "RIGHT"))
+        if not job_id:
+            return None
+        job = self.get(job_id)
+        if job is None:
+            # Expired while queued
+            self.redis.lrem(JOB_PROCESSING_KEY, 0, job_id)
+            return None
+        self.update(job_id, dequeued_at=time.time())
+        job["dequeued_at"] = time.time()
+        return job
+
+    def requeue(self, job_id):
+        """Put a job back at the head of the queue (e.g. when the scrape lock is busy)"""
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hdel(self.job_key(job_id), "dequeued_at")
+        pipe.lrem(JOB_PROCESSING_KEY, 0, job_id)
+        pipe.lpush(JOB_QUEUE_KEY, job_id)
+        pipe.execute()
+
+    def is_stale(self, job):
+        """
+        True when a job's worker is gone: it is running but nobody holds the scrape
+        lock (held for the whole run), or it was dequeued long ago and never started.
+        """
+        if job["status"] == JOB_RUNNING:
+            return not self.redis.exists(SCRAPE_LOCK_KEY)
+        if job["status"] == JOB_QUEUED and job.get("dequeued_at"):
+            return time.time() - job["dequeued_at"] > STALE_DEQUEUE_SECONDS
+        return False
+
+    def recover(self):
+        """Requeue jobs left on the processing list by dead workers; returns how many"""
+        recovered = 0
+        for job_id in self.redis.lrange(JOB_PROCESSING_KEY, 0, -1):
+            job_id = to_str(job_id)
+            job = self.get(job_id)
+            if job is None or job["status"] not in (JOB_QUEUED, JOB_RUNNING):
+                self.redis.lrem(JOB_PROCESSING_KEY, 0, job_id)
+            elif self.is_stale(job):
+                self.update(job_id, status=JOB_QUEUED, progress="Requeued after a worker stopped")
+                self.requeue(job_id)
+                recovered += 1
+        return recovered
+
+    def get(self, job_id):
+        data = self.redis.hgetall(self.job_key(job_id))
+        if not data:
+            return None
+        job = {to_str(k): to_str(v) for k, v in data.items()}
+        job["params"] = json.loads(job.get("params") or "{}")
+        if job.get("result"):
+            job["result"] = json.loads(job["result"])
+        for field in ("created_at", "dequeued_at", "started_at", "finished_at"):
+            if job.get(field):
+                job[field] = float(job[field])
+        return job
+
+    def update(self, job_id, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        self.redis.hset(self.job_key(job_id), mapping=fields)
+
+    def set_progress(self, job_id, message):
+        self.update(job_id, progress=message)
+
+    def finish(self, job_id, job_type, status, result=None, error=None):
+        fields = {"status": status, "finished_at": time.time(), "progress": status.capitalize()}
+        if result is not None:
+            fields["result"] = result
+        if error:
+            fields["error"] = error
+        self.update(job_id, **fields)
+        self.redis.lrem(JOB_PROCESSING_KEY, 0, job_id)
+
+        # Free the slot so the next request for this job type queues a new job
+        self.redis.eval(_RELEASE_SCRIPT, 1, f"{ACTIVE_JOB_KEY_PREFIX}{job_type}", job_id)
+
+    def queue_length(self):
+        return self.redis.llen(JOB_QUEUE_KEY)
@@ -0,0 +1,238 @@
+import re
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+from product_fields import normalize_numeric_fields
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    # Lexbor engine; selectolax.parser (Modest) is deprecated and gone from newer releases
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+DEFAULT_BASE_URL = "https://www.croma.com"
+DEFAULT_AVAILABILITY = 'Standard Delivery by Tomorrow'
+
+# Field selectors used on every product card, in extraction order
+CARD_SELECTORS = {
+    'container': 'div.cp-product',
+    'title': 'h3.product-title a',
+    'image': 'div[data-testid="product-img"] img',
+    'rating': 'span.rating-text',
+    'review': 'span.rating-text-icon span:last-child',
+    'current_price': 'span[data-testid="new-price"]',
+    'original_price': 'span[data-testid="old-price"]',
+    'discount': 'span.discount-newsearch-plp',
+    'offers': 'span.tagsForPlp',
+    'delivery': 'span.delivery-text-msg span',
+}
+
+# Compiled once at import instead of on every select_one call
+COMPILED_SELECTORS = {name: soupsieve.compile(selector) for name, selector in CARD_SELECTORS.items()}
+
+# Only <li class="product-item"> subtrees are built when parsing with a strainer
+PRODUCT_ITEM_STRAINER = SoupStrainer('li', class_='product-item')
+
+# Where product cards are looked for, most specific first, so recommendation and
+# carousel cards outside the product list are only used when there is no list.
+# (card selector, strainer building just that container, substring the page must contain)
+PRODUCT_LIST_CHAIN = (
+    ('#product-list-back li.product-item', SoupStrainer(id='product-list-back'), 'product-list-back'),
+    ('ul.product-list li.product-item', SoupStrainer('ul', class_='product-list'), 'product-list'),
+    ('li.product-item', PRODUCT_ITEM_STRAINER, None),
+)
+
+_RATING_RE = re.compile(r'^\d+(\.\d+)?$')
+_REVIEW_RE = re.compile(r'\((\d+)\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+PARSER_BACKENDS = ('html.parser', 'lxml', 'selectolax')
+
+
+def _absolute_image_url(img_src, base_url):
+    if img_src.startswith('//'):
+        return 'https:' + img_src
+    if img_src.startswith('/'):
+        return base_url + img_src
+    return img_src
+
+
+def _build_product(product_id, index, title_text, title_href, img_src, rating_text, review_text,
+                   price_text, original_price_text, discount_text, offer_texts, delivery_text, base_url):
+    """Apply the Croma field rules to raw card values; shared by every backend"""
+    product = {'product_id': product_id or f"croma_product_{index}"}
+
+    if title_text is not None:
+        product['title'] = title_text
+        # Extract brand from title (first word)
+        title_words = title_text.split()
+        product['brand'] = title_words[0] if title_words else 'Croma'
+    else:
+        product['title'] = 'Unknown Product'
+        product['brand'] = 'Croma'
+
+    if img_src:
+        product['image'] = _absolute_image_url(img_src, base_url)
+
+    if title_href:
+        if title_href.startswith('/'):
+            title_href = base_url + title_href
+        product['url'] = title_href
+
+    if rating_text and _RATING_RE.match(rating_text):
+        product['rating'] = rating_text
+
+    if review_text is not None:
+        # Extract number from parentheses like (97)
+        review_match = _REVIEW_RE.search(review_text)
+        if review_match:
+            product['review_count'] = review_match.group(1)
+
+    if price_text is not None:
+        product['current_price'] = _WHITESPACE_RE.sub('', price_text)
+
+    if original_price_text is not None:
+        product['original_price'] = original_price_text
+
+    if discount_text is not None:
+        product['discount'] = discount_text
+
+    product['offers'] = [text for text in offer_texts if text]
+    product['availability'] = delivery_text if delivery_text is not None else DEFAULT_AVAILABILITY
+
+    # Typed numeric fields (prices in paise, discount %, rating, review count)
+    normalize_numeric_fields(product)
+    return product
+
+
+def extract_product_from_tag(product_item, index, base_url=DEFAULT_BASE_URL):
+    """Extract one product from a BeautifulSoup li.product-item tag"""
+    select = COMPILED_SELECTORS
+
+    product_container = select['container'].select_one(product_item)
+    if not product_container:
+        return None
+
+    def text_of(name):
+        elem = select[name].select_one(product_item)
+        return elem.get_text(strip=True) if elem else None
+
+    title_elem = select['title'].select_one(product_item)
+    img_elem = select['image'].select_one(product_item)
+
+    return _build_product(
+        product_id=product_container.get('id'),
+        index=index,
+        title_text=title_elem.get_text(strip=True) if title_elem else None,
+        title_href=title_elem.get('href') if title_elem else None,
+        img_src=(img_elem.get('src') or img_elem.get('data-src')) if img_elem else None,
+        rating_text=text_of('rating'),
+        review_text=text_of('review'),
+        price_text=text_of('current_price'),
+        original_price_text=text_of('original_price'),
+        discount_text=text_of('discount'),
+        offer_texts=[elem.get_text(strip=True) for elem in select['offers'].select(product_item)],
+        delivery_text=text_of('delivery'),
+        base_url=base_url,
+    )
+
+
+def extract_product_from_node(product_item, index, base_url=DEFAULT_BASE_URL):
+    """Extract one product from a selectolax (Lexbor) li.product-item node"""
+    product_container = product_item.css_first(CARD_SELECTORS['container'])
+    if product_container is None:
+        return None
+
+    def text_of(name):
+        elem = product_item.css_first(CARD_SELECTORS[name])
+        return elem.text(strip=True) if elem is not None else None
+
+    title_elem = product_item.css_first(CARD_SELECTORS['title'])
+    img_elem = product_item.css_first(CARD_SELECTORS['image'])
+    img_attrs = img_elem.attributes if img_elem is not None else {}
+
+    return _build_product(
+        product_id=product_container.attributes.get('id'),
+        index=index,
+        title_text=title_elem.text(strip=True) if title_elem is not None else None,
+        title_href=title_elem.attributes.get('href') if title_elem is not None else None,
+        img_src=img_attrs.get('src') or img_attrs.get('data-src'),
+        rating_text=text_of('rating'),
+        review_text=text_of('review'),
+        price_text=text_of('current_price'),
+        original_price_text=text_of('original_price'),
+        discount_text=text_of('discount'),
+        offer_texts=[elem.text(strip=True) for elem in product_item.css(CARD_SELECTORS['offers'])],
+        delivery_text=text_of('delivery'),
+        base_url=base_url,
+    )
+
+
+class ListingParser:
+    """
+    Pluggable listing-page parser.
+    'html.parser' and 'lxml' build BeautifulSoup trees restricted to the product
+    list container; 'selectolax' uses the Lexbor engine. All backends prefer
+    #product-list-back, then ul.product-list, then any li.product-item, and produce
+    the same product dicts. Unavailable backends fall back to the next best one.
+    """
+
+    def __init__(self, backend='auto', base_url=DEFAULT_BASE_URL):
+        self.base_url = base_url
+        self.backend = self._resolve_backend(backend)
+
+    def _resolve_backend(self, backend):
+        if backend == 'auto':
+            backend = 'selectolax' if SelectolaxParser else 'lxml'
+        if backend == 'selectolax' and SelectolaxParser is None:
+            backend = 'lxml'
+        if backend == 'lxml' and not HAS_LXML:
+            backend = 'html.parser'
+        if backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend '{backend}'")
+        return backend
+
+    def build_soup(self, html):
+        """Full BeautifulSoup tree with the fastest available builder"""
+        return BeautifulSoup(html, 'lxml' if HAS_LXML else 'html.parser')
+
+    def find_product_items(self, html):
+        """Return the li.product-item nodes of a listing page's product list"""
+        if self.backend == 'selectolax':
+            tree = SelectolaxParser(html)
+            for selector, _, _ in PRODUCT_LIST_CHAIN:
+                items = tree.css(selector)
+                if items:
+                    return items
+            return []
+        for selector, strainer, marker in PRODUCT_LIST_CHAIN:
+            # Skip a strained parse for containers the page cannot contain
+            if marker and marker not in html:
+                continue
+            items = BeautifulSoup(html, self.backend, parse_only=strainer).select(selector)
+            if items:
+                return items
+        return []
+
+    def extract(self, product_item, index):
+        if self.backend == 'selectolax':
+            return extract_product_from_node(product_item, index, self.base_url)
+        return extract_product_from_tag(product_item, index, self.base_url)
+
+    def parse(self, html, start=0):
+        """Extract products from a listing page, skipping the first `start` cards"""
+        products = []
+        for offset, item in enumerate(self.find_product_items(html)[start:]):
+            try:
+                product = self.extract(item, start + offset + 1)
+            except Exception as e:
+                print(f"Error extracting product {start + offset + 1}: {e}")
+                continue
+            if product:
+                products.append(product)
+        return products
@@ -0,0 +1,118 @@
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from browser_probes import PRODUCT_CARD_SELECTOR, probe_image_status
+
+# Records the time of the last DOM insertion, image src change or finished
+# resource fetch, so Python can ask "how long has the page been quiet?"
+NETWORK_MONITOR_SCRIPT = """
+if (!window.__scraperActivity) {
+    window.__scraperActivity = {last: Date.now()};
+    var mark = function () { window.__scraperActivity.last = Date.now(); };
+    new MutationObserver(mark).observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ['src', 'srcset']
+    });
+    try {
+        new PerformanceObserver(mark).observe({entryTypes: ['resource']});
+    } catch (e) {}
+}
+return true;
+"""
+
+QUIET_TIME_SCRIPT = """
+return window.__scraperActivity ? Date.now() - window.__scraperActivity.last : null;
+"""
+
+CARD_COUNT_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+
+def wait_until(driver, condition, timeout, poll_interval=0.1):
+    """Poll `condition(driver)` until it returns a truthy value; returns it, or None on timeout"""
+    if timeout <= 0:
+        return None
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll_interval).until(condition)
+    except TimeoutException:
+        return None
+    except WebDriverException as e:
+        print(f"Error while waiting: {e}")
+        return None
+
+
+def count_cards(driver):
+    return driver.execute_script(CARD_COUNT_SCRIPT, PRODUCT_CARD_SELECTOR)
+
+
+def install_network_monitor(driver):
+    """Inject the activity monitor into the current document (idempotent)"""
+    try:
+        driver.execute_script(NETWORK_MONITOR_SCRIPT)
+    except WebDriverException as e:
+        print(f"Could not install network monitor: {e}")
+
+
+def wait_for_card_count(driver, min_count, timeout):
+    """Block until at least `min_count` product cards exist; returns the current count"""
+    def enough_cards(d):
+        count = count_cards(d)
+        return count if count >= min_count else None
+
+    count = wait_until(driver, enough_cards, timeout)
+    return count if count is not None else count_cards(driver)
+
+
+def wait_for_network_idle(driver, timeout, idle_ms=500):
+    """Block until the page has had no DOM/resource activity for `idle_ms`"""
+    install_network_monitor(driver)
+
+    def is_idle(d):
+        quiet = d.execute_script(QUIET_TIME_SCRIPT)
+        return quiet is None or quiet >= idle_ms
+
+    return wait_until(driver, is_idle, timeout) is not None
+
+
+def wait_for_new_cards_or_idle(driver, previous_count, timeout, idle_ms=400):
+    """
+    After a scroll, return as soon as new cards appear or the page goes quiet.
+    Returns the card count at that point.
+    """
+    install_network_monitor(driver)
+
+    def settled(d):
+        count = count_cards(d)
+        if count > previous_count:
+            return count
+        quiet = d.execute_script(QUIET_TIME_SCRIPT)
+        if quiet is None or quiet >= idle_ms:
+            return count or -1
+        return None
+
+    count = wait_until(driver, settled, timeout)
+    if count is None or count < 0:
+        return count_cards(driver)
+    return count
+
+
+def wait_for_images(driver, start=0, end=None, timeout=5):
+    """Block until every card in [start, end) shows a real image; True if they all did"""
+    if end is not None and end <= start:
+        return True
+
+    def all_loaded(d):
+        return all(probe_image_status(d, start, end)['cards'])
+
+    return wait_until(driver, all_loaded, timeout) is not None
+
+
+class Deadline:
+    """Overall time budget for one scrape, split across individual waits"""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self, cap=None):
+        left = max(0.0, self.expires_at - time.monotonic())
+        return min(left, cap) if cap is not None else left
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
@@ -0,0 +1,147 @@
+import time
+
+from serialization import to_str
+
+HISTORY_KEY_PREFIX = "price:history:"
+STATS_KEY_PREFIX = "price:stats:"
+LAST_POINT_KEY = "price:last"
+
+# Appends a point only when the price fields differ from the last recorded ones and
+# keeps running count/sum/min/max of the current price, so whole-history aggregates
+# never scan the series. A point is the member "<ts>:<price>:<original>:<discount>"
+# (empty for missing values) scored by its timestamp.
+_RECORD_SCRIPT = """
+local value = ARGV[3] .. ':' .. ARGV[4] .. ':' .. ARGV[5]
+if redis.call('hget', KEYS[3], ARGV[1]) == value then
+    return 0
+end
+redis.call('hset', KEYS[3], ARGV[1], value)
+redis.call('zadd', KEYS[1], ARGV[2], ARGV[2] .. ':' .. value)
+redis.call('hsetnx', KEYS[2], 'first_ts', ARGV[2])
+redis.call('hset', KEYS[2], 'last_ts', ARGV[2])
+redis.call('hincrby', KEYS[2], 'points', 1)
+if ARGV[3] ~= '' then
+    local price = tonumber(ARGV[3])
+    local low = tonumber(redis.call('hget', KEYS[2], 'min'))
+    local high = tonumber(redis.call('hget', KEYS[2], 'max'))
+    if not low or price < low then redis.call('hset', KEYS[2], 'min', price) end
+    if not high or price > high then redis.call('hset', KEYS[2], 'max', price) end
+    redis.call('hincrby', KEYS[2], 'count', 1)
+    redis.call('hincrby', KEYS[2], 'sum', price)
+end
+return 1
+"""
+
+# min/max/sum of the current price over the points in a score window, computed in
+# Redis so only the aggregates cross the wire. Prices are integer paise.
+_WINDOW_STATS_SCRIPT = """
+local members = redis.call('zrangebyscore', KEYS[1], ARGV[1], ARGV[2])
+local count, total, low, high = 0, 0, false, false
+for _, member in ipairs(members) do
+    local price = tonumber(string.match(member, '^[^:]*:([^:]*):'))
+    if price then
+        count = count + 1
+        total = total + price
+        if not low or price < low then low = price end
+        if not high or price > high then high = price end
+    end
+end
+return {#members, count, tostring(total), low, high}
+"""
+
+
+def _encode(value):
+    # Paise are stored as integers; fractional values such as discounts keep their decimals
+    if value is None:
+        return ''
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def _decode(value, cast=int):
+    return cast(value) if value else None
+
+
+def decode_point(member):
+    """Turn a stored "<ts>:<price>:<original>:<discount>" member into a dict"""
+    timestamp, price, original_price, discount = to_str(member).split(':')
+    return {
+        "timestamp": int(timestamp),
+        "price_paise": _decode(price),
+        "original_price_paise": _decode(original_price),
+        "discount_percent": _decode(discount, float),
+    }
+
+
+class PriceHistory:
+    """
+    Price time series per product in Redis sorted sets (score = unix timestamp).
+    Fed by ProductStore writes; a point is stored only when current price,
+    original price or discount changed since the previous one.
+    """
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    def history_key(self, product_id):
+        return f"{HISTORY_KEY_PREFIX}{product_id}"
+
+    def stats_key(self, product_id):
+        return f"{STATS_KEY_PREFIX}{product_id}"
+
+    def record(self, products, timestamp=None):
+        """Record the prices of the given products; returns how many points were added"""
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        pipe = self.redis.pipeline(transaction=False)
+        for product in products:
+            product_id = product['product_id']
+            pipe.eval(_RECORD_SCRIPT, 3, self.history_key(product_id), self.stats_key(product_id), LAST_POINT_KEY,
+                      product_id, timestamp, _encode(product.get('price_paise')),
+                      _encode(product.get('original_price_paise')), _encode(product.get('discount_percent')))
+        return sum(pipe.execute()) if products else 0
+
+    def get_points(self, product_id, start=None, end=None, limit=None):
+        """Points between two unix timestamps (inclusive), oldest first"""
+        start = '-inf' if start is None else start
+        end = '+inf' if end is None else end
+        if limit:
+            # Most recent `limit` points in the window
+            members = self.redis.zrevrangebyscore(self.history_key(product_id), end, start, start=0, num=limit)
+            members.reverse()
+        else:
+            members = self.redis.zrangebyscore(self.history_key(product_id), start, end)
+        return [decode_point(m) for m in members]
+
+    def get_stats(self, product_id):
+        """
+        Whole-history aggregates from the running counters, or None if never recorded.
+        The average is over recorded price changes, not weighted by time.
+        """
+        stats = {to_str(k): int(v) for k, v in self.redis.hgetall(self.stats_key(product_id)).items()}
+        if not stats:
+            return None
+        count = stats.get('count', 0)
+        return {
+            "points": stats.get('points', 0),
+            "min_price_paise": stats.get('min'),
+            "max_price_paise": stats.get('max'),
+            "avg_price_paise": round(stats['sum'] / count) if count else None,
+            "first_seen": stats.get('first_ts'),
+            "last_changed": stats.get('last_ts'),
+        }
+
+    def get_window_stats(self, product_id, start=None, end=None):
+        """Aggregates over the points between two unix timestamps, or None if there are none"""
+        start = '-inf' if start is None else start
+        end = '+inf' if end is None else end
+        points, count, total, low, high = self.redis.eval(_WINDOW_STATS_SCRIPT, 1, self.history_key(product_id),
+                                                          start, end)
+        if not points:
+            return None
+        return {
+            "points": points,
+            "min_price_paise": low,
+            "max_price_paise": high,
+            "avg_price_paise": round(int(total) / count) if count else None,
+        }
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import re
+
+NUMERIC_FIELDS = ('price_paise', 'original_price_paise', 'discount_percent', 'rating_value', 'review_count_value')
+
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def parse_price_paise(text):
+    """Convert a price string like '₹25,999' or '₹25,999.50' to integer paise"""
+    if not text:
+        return None
+    match = _NUMBER_RE.search(str(text).replace(',', ''))
+    if not match:
+        return None
+    return int(round(float(match.group()) * 100))
+
+
+def parse_float(text):
+    """Parse the first number in a string like '4.2' or '28% Off'"""
+    if text is None:
+        return None
+    match = _NUMBER_RE.search(str(text).replace(',', ''))
+    return float(match.group()) if match else None
+
+
+def parse_int(text):
+    value = parse_float(text)
+    return int(value) if value is not None else None
+
+
+def numeric_fields(product):
+    """
+    Derive typed numeric fields from the display strings of a product:
+    prices in paise, discount percent, rating and review count.
+    Missing or unparsable values are None.
+    """
+    price = parse_price_paise(product.get('current_price'))
+    original_price = parse_price_paise(product.get('original_price'))
+
+    discount = parse_float(product.get('discount'))
+    if discount is None and price is not None and original_price:
+        discount = round((original_price - price) * 100 / original_price, 1)
+
+    return {
+        'price_paise': price,
+        'original_price_paise': original_price,
+        'discount_percent': discount,
+        'rating_value': parse_float(product.get('rating')),
+        'review_count_value': parse_int(product.get('review_count')),
+    }
+
+
+def normalize_numeric_fields(product):
+    """Add the typed numeric fields to a product dict in place"""
+    product.update(numeric_fields(product))
+    return product
+
+
+def content_hash(product):
+    """Stable digest of a product's normalized fields, used to skip unchanged writes"""
+    # Always stdlib json: the digest must not depend on which serializer a process has
+    payload = json.dumps(product, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
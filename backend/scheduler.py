@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import random
+import time
+
+from serialization import to_str
+from storage import CATALOG_UPDATED_KEY
+
+logger = logging.getLogger(__name__)
+
+SCHEDULE_STATE_KEY = "schedule:pages"
+SCHEDULE_TICK_KEY = "schedule:tick"
+REFRESH_JOB_TYPE = "refresh_pages"
+FULL_SCRAPE_JOB_TYPE = "full_scrape"
+
+DEFAULT_INTERVAL = int(os.environ.get("RESCRAPE_INTERVAL", "3600"))
+DEFAULT_PAGES = int(os.environ.get("RESCRAPE_PAGES", "3"))
+DEFAULT_BUDGET = int(os.environ.get("RESCRAPE_BUDGET", "4"))
+DEFAULT_CONCURRENCY = int(os.environ.get("RESCRAPE_CONCURRENCY", "2"))
+
+# Pages whose products always change are refreshed up to this many times more often
+CHANGE_BOOST = 3.0
+# Weight of the latest scrape in the running change rate
+CHANGE_RATE_ALPHA = 0.3
+# Failed or empty pages wait interval * 2^(failures - 1), up to this long
+MAX_FAILURE_BACKOFF = 24 * 3600
+
+
+def page_id(url, page):
+    return f"{url}|{page}"
+
+
+def effective_interval(interval, change_rate, min_interval):
+    """Refresh interval shortened for pages that change often"""
+    return max(interval / (1 + CHANGE_BOOST * change_rate), min_interval)
+
+
+class RescrapeScheduler:
+    """
+    Periodically queues refreshes of individual listing pages.
+    Every page has a due time: its last scrape plus an interval that shrinks with
+    the page's running change rate, with jitter so pages drift apart. Each tick
+    the most overdue pages, at most `budget` of them, are queued as one
+    refresh_pages job that fetches `concurrency` pages at a time.
+    """
+
+    def __init__(self, redis_client, job_queue, category_urls, pages=DEFAULT_PAGES, interval=DEFAULT_INTERVAL,
+                 budget=DEFAULT_BUDGET, concurrency=DEFAULT_CONCURRENCY, jitter=0.1, tick=60):
+        self.redis = redis_client
+        self.job_queue = job_queue
+        self.category_urls = list(category_urls)
+        self.pages = pages
+        self.interval = interval
+        self.min_interval = interval / 10
+        self.budget = budget
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.tick = tick
+
+    def targets(self):
+        return [(url, page) for url in self.category_urls for page in range(self.pages)]
+
+    def load_state(self):
+        raw = self.redis.hgetall(SCHEDULE_STATE_KEY)
+        return {to_str(k): json.loads(v) for k, v in raw.items()}
+
+    def due_pages(self, now=None):
+        """(url, page) targets that are due, most overdue first, limited to the budget"""
+        now = now or time.time()
+        state = self.load_state()
+        # Pages not scraped by the scheduler yet count as fresh as the last full scrape
+        catalog_updated = float(self.redis.get(CATALOG_UPDATED_KEY) or 0)
+        due = []
+        for url, page in self.targets():
+            entry = state.get(page_id(url, page)) or {
+                "last_scraped": catalog_updated, "change_rate": 1.0,
+                "next_due": catalog_updated + self.interval,
+            }
+            if now < entry["next_due"]:
+                continue
+            interval = effective_interval(self.interval, entry["change_rate"], self.min_interval)
+            due.append(((now - entry["last_scraped"]) / interval, url, page))
+        due.sort(key=lambda item: item[0], reverse=True)
+        return [(url, page) for _, url, page in due[:self.budget]]
+
+    def run_once(self, now=None):
+        """Queue a refresh job for the due pages; returns the job id or None"""
+        # Only one process schedules per tick, however many API/worker processes run this
+        if not self.redis.set(SCHEDULE_TICK_KEY, os.getpid(), nx=True, ex=max(int(self.tick) - 1, 1)):
+            return None
+        # A pending full scrape refreshes every page anyway
+        if self.job_queue.is_active(FULL_SCRAPE_JOB_TYPE):
+            return None
+        targets = self.due_pages(now)
+        if not targets:
+            return None
+        job_id, created = self.job_queue.enqueue(REFRESH_JOB_TYPE, {
+            "targets": [[url, page] for url, page in targets],
+            "concurrency": self.concurrency,
+            "interval": self.interval,
+        })
+        if created:
+            logger.info(f"🗓️ Queued refresh of {len(targets)} listing pages (job {job_id})")
+        return job_id
+
+    def run_forever(self, stop_event=None):
+        logger.info(f"🗓️ Rescrape scheduler started: {len(self.targets())} pages, "
+                    f"interval {self.interval}s, budget {self.budget} pages per tick")
+        while not (stop_event and stop_event.is_set()):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Scheduler tick failed: {e}")
+            # Jittered sleep so several processes do not tick in lockstep
+            delay = self.tick * random.uniform(1 - self.jitter, 1 + self.jitter)
+            if stop_event:
+                stop_event.wait(delay)
+            else:
+                time.sleep(delay)
+
+
+def record_page_scrape(redis_client, url, page, scraped, changed, interval=DEFAULT_INTERVAL, jitter=0.1, now=None):
+    """Update a page's change rate and next due time after it was scraped"""
+    now = now or time.time()
+    key = page_id(url, page)
+    previous = redis_client.hget(SCHEDULE_STATE_KEY, key)
+    entry = json.loads(previous) if previous else {"change_rate": 1.0, "scrapes": 0}
+
+    change_fraction = changed / scraped if scraped else 0.0
+    entry["change_rate"] = (1 - CHANGE_RATE_ALPHA) * entry["change_rate"] + CHANGE_RATE_ALPHA * change_fraction
+    entry["scrapes"] += 1
+    entry["failures"] = 0
+    entry["last_scraped"] = now
+    entry["last_changed"] = changed
+
+    next_interval = effective_interval(interval, entry["change_rate"], interval / 10)
+    entry["next_due"] = now + next_interval * random.uniform(1 - jitter, 1 + jitter)
+
+    redis_client.hset(SCHEDULE_STATE_KEY, key, json.dumps(entry))
+    return entry
+
+
+def record_page_failure(redis_client, url, page, interval=DEFAULT_INTERVAL, jitter=0.1, now=None):
+    """Back off a page that failed or came back empty, doubling the wait per consecutive failure"""
+    now = now or time.time()
+    key = page_id(url, page)
+    previous = redis_client.hget(SCHEDULE_STATE_KEY, key)
+    entry = json.loads(previous) if previous else {"change_rate": 1.0, "scrapes": 0}
+
+    entry["failures"] = entry.get("failures", 0) + 1
+    entry.setdefault("last_scraped", now)
+    entry["last_failed"] = now
+
+    backoff = min(interval * 2 ** (entry["failures"] - 1), MAX_FAILURE_BACKOFF)
+    entry["next_due"] = now + backoff * random.uniform(1 - jitter, 1 + jitter)
+
+    redis_client.hset(SCHEDULE_STATE_KEY, key, json.dumps(entry))
+    return entry
@@ -1,9 +1,11 @@
-import requests
-from bs4 import BeautifulSoup
 import redis
-import json
-import re
+import atexit
+import multiprocessing
+import os
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from fake_useragent import UserAgent
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -11,12 +13,48 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException, ElementNotInteractableException
+from storage import ProductStore
+from image_cache import default_image_cache
+from listing_parser import ListingParser, extract_product_from_tag
+from browser_extractor import extract_products_in_browser
+from driver_pool import DriverPool
+from browser_profiles import apply_blocking, configure_options, resolve_profile
+from image_resolution import apply_images, resolve_image_urls, scroll_card_into_view
+from browser_probes import probe_image_status, probe_product_ids
+from http_scraper import CromaHttpScraper
+from page_waits import (Deadline, count_cards, wait_for_card_count, wait_for_network_idle,
+                        wait_for_new_cards_or_idle, wait_for_images)
 
 class CromaProductScraper:
-    def __init__(self):
+    def __init__(self, step_timeout=5, scrape_deadline=120, extraction_mode='browser', resource_profile=None,
+                 resolve_images=True):
+        # step_timeout caps a single wait; scrape_deadline caps a whole scrape
+        self.step_timeout = step_timeout
+        self.scrape_deadline = scrape_deadline
+        # 'browser' extracts with one execute_script; 'html' parses driver.page_source
+        self.extraction_mode = extraction_mode
+        # Which requests the browsers block: 'full', 'images' or 'data' (see browser_profiles)
+        self.resource_profile = resolve_profile(resource_profile)
+        # Derive image URLs from card attributes/page state; scroll only for cards that need it
+        self.resolve_images = resolve_images
+        # Open load-more page and its extraction watermark, reused between calls
+        self._view_more_session = None
+        self.view_more_session_idle = 600
+        # Closes the held page once it has been idle for view_more_session_idle seconds
+        self._view_more_timer = None
+        # Reentrant: close_view_more_session takes it and is also called while it is held
+        self._view_more_lock = threading.RLock()
         self.ua = UserAgent()
         self.redis_client = redis.Redis(host='localhost', port=6379, db=0)
+        self.store = ProductStore(self.redis_client, image_cache=default_image_cache(self.redis_client))
+        # Warm browser sessions shared by all scrape methods
+        self.driver_pool = DriverPool(self.init_selenium_driver, max_size=2, max_uses=25)
+        atexit.register(self.close_view_more_session)
         self.base_url = "https://www.croma.com"
+        # Browser-free fast path for listing data
+        self.http_scraper = CromaHttpScraper(self.base_url, user_agent=self.ua.random)
+        # Parses only the product list container with the fastest available backend
+        self.listing_parser = ListingParser(backend='auto', base_url=self.base_url)
     
     def init_selenium_driver(self):
         """Initialize Selenium WebDriver with Chrome options"""
@@ -27,9 +65,12 @@ class CromaProductScraper:
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument(f'--user-agent={self.ua.random}')
+        configure_options(chrome_options, self.resource_profile)
         
         try:
             driver = webdriver.Chrome(options=chrome_options)
+            # Fonts, trackers and ads (and images for 'data') are never fetched
+            apply_blocking(driver, self.resource_profile)
             return driver
         except Exception as e:
             print(f"Error initializing Chrome driver: {e}")
@@ -59,138 +100,54 @@ class CromaProductScraper:
     
     def extract_product_croma(self, product_item, index):
         """Extract product using actual Croma website selectors"""
-        product = {}
-        
         try:
-            # Get the main product container
-            product_container = product_item.select_one('div.cp-product')
-            if not product_container:
-                return None
-            
-            # Product ID from the div id attribute
-            product_id = product_container.get('id')
-            product['product_id'] = product_id or f"croma_product_{index}"
-            
-            # Title from h3.product-title > a
-            title_elem = product_item.select_one('h3.product-title a')
-            if title_elem:
-                product['title'] = title_elem.get_text(strip=True)
-                # Extract brand from title (first word)
-                title_words = product['title'].split()
-                if title_words:
-                    product['brand'] = title_words[0]
-                else:
-                    product['brand'] = 'Croma'
-            else:
-                product['title'] = 'Unknown Product'
-                product['brand'] = 'Croma'
-            
-            # Image from div[data-testid="product-img"] img
-            img_elem = product_item.select_one('div[data-testid="product-img"] img')
-            if img_elem:
-                img_src = img_elem.get('src') or img_elem.get('data-src')
-                if img_src:
-                    if img_src.startswith('//'):
-                        img_src = 'https:' + img_src
-                    elif img_src.startswith('/'):
-                        img_src = self.base_url + img_src
-                    product['image'] = img_src
-            
-            # Product URL from h3.product-title > a
-            if title_elem and title_elem.get('href'):
-                href = title_elem.get('href')
-                if href.startswith('/'):
-                    href = self.base_url + href
-                product['url'] = href
-            
-            # Rating from span.rating-text
-            rating_elem = product_item.select_one('span.rating-text')
-            if rating_elem:
-                rating_text = rating_elem.get_text(strip=True)
-                if rating_text and re.match(r'^\d+(\.\d+)?$', rating_text):
-                    product['rating'] = rating_text
-            
-            # Review count from rating section
-            review_elem = product_item.select_one('span.rating-text-icon span:last-child')
-            if review_elem:
-                review_text = review_elem.get_text(strip=True)
-                # Extract number from parentheses like (97)
-                review_match = re.search(r'\((\d+)\)', review_text)
-                if review_match:
-                    product['review_count'] = review_match.group(1)
-            
-            # Current price from span[data-testid="new-price"]
-            current_price_elem = product_item.select_one('span[data-testid="new-price"]')
-            if current_price_elem:
-                price_text = current_price_elem.get_text(strip=True)
-                # Clean up the price (remove extra whitespace)
-                price_clean = re.sub(r'\s+', '', price_text)
-                product['current_price'] = price_clean
-            
-            # Original price from span[data-testid="old-price"]
-            original_price_elem = product_item.select_one('span[data-testid="old-price"]')
-            if original_price_elem:
-                original_price = original_price_elem.get_text(strip=True)
-                product['original_price'] = original_price
-            
-            # Discount from span.discount-newsearch-plp
-            discount_elem = product_item.select_one('span.discount-newsearch-plp')
-            if discount_elem:
-                discount_text = discount_elem.get_text(strip=True)
-                product['discount'] = discount_text
-            
-            # Offers from span.tagsForPlp
-            offer_elements = product_item.select('span.tagsForPlp')
-            offers = []
-            for offer_elem in offer_elements:
-                offer_text = offer_elem.get_text(strip=True)
-                if offer_text:
-                    offers.append(offer_text)
-            product['offers'] = offers
-            
-            # Availability from delivery section
-            delivery_elem = product_item.select_one('span.delivery-text-msg span')
-            if delivery_elem:
-                delivery_text = delivery_elem.get_text(strip=True)
-                product['availability'] = delivery_text
-            else:
-                product['availability'] = 'Standard Delivery by Tomorrow'
-            
-            return product
-            
+            return extract_product_from_tag(product_item, index, self.base_url)
         except Exception as e:
             print(f"Error extracting product {index}: {e}")
             return None
     
-    def scroll_with_early_intervention(self, driver, target_cards=12):
-        """Intervene early to control card loading and ensure proper image loading"""
+    def extract_loaded_products(self, driver, start=0):
+        """Extract products for cards from index `start` onward from the live page"""
+        if self.extraction_mode == 'browser':
+            try:
+                return extract_products_in_browser(driver, start, self.base_url)
+            except Exception as e:
+                print(f"In-browser extraction failed, parsing page HTML instead: {e}")
+        return self.listing_parser.parse(driver.page_source, start=start)
+    
+    def scroll_with_early_intervention(self, driver, target_cards=12, deadline=None, load_images=True):
+        """
+        Intervene early to control card loading and ensure proper image loading.
+        With load_images=False only cards are loaded; images are resolved afterwards.
+        """
         print(f"Early intervention: targeting {target_cards} cards with proper image loading")
+        deadline = deadline or Deadline(self.scrape_deadline)
         
         cards_loaded = 0
         scroll_position = 0
         scroll_steps = 0
         max_scroll_steps = 30
         
-        # Start with minimal scroll to see what loads initially
-        time.sleep(0.5)  # Very brief initial wait
-        initial_cards = len(driver.find_elements(By.CSS_SELECTOR, "li.product-item"))
+        # Wait until the first cards render instead of a fixed pause
+        initial_cards = wait_for_card_count(driver, 1, deadline.remaining(self.step_timeout))
         print(f"  📊 Initial cards detected: {initial_cards}")
         
         if initial_cards >= target_cards:
+            if not load_images:
+                return min(initial_cards, target_cards)
             print(f"  ⚠️  Too many cards loaded initially ({initial_cards}), using image-focused strategy")
-            return self.focus_on_image_loading(driver, initial_cards, target_cards)
+            return self.focus_on_image_loading(driver, initial_cards, target_cards, deadline)
         
         # Gradual loading approach if we have few initial cards
-        while cards_loaded < target_cards and scroll_steps < max_scroll_steps:
+        while cards_loaded < target_cards and scroll_steps < max_scroll_steps and not deadline.expired():
             scroll_steps += 1
             
             # Very small scroll increments
             scroll_position += 150  # Very small steps
             driver.execute_script(f"window.scrollTo(0, {scroll_position});")
-            time.sleep(1)  # Allow loading
             
-            # Check current state
-            current_cards = len(driver.find_elements(By.CSS_SELECTOR, "li.product-item"))
+            # Continue as soon as new cards appear or the page goes quiet
+            current_cards = wait_for_new_cards_or_idle(driver, cards_loaded, deadline.remaining(self.step_timeout))
             
             if current_cards > cards_loaded:
                 new_cards = current_cards - cards_loaded
@@ -198,9 +155,9 @@ class CromaProductScraper:
                 print(f"  📦 Step {scroll_steps}: {cards_loaded} cards (new: +{new_cards})")
                 
                 # Intensive image loading every few cards
-                if cards_loaded % 3 == 0 or current_cards >= target_cards:
+                if load_images and (cards_loaded % 3 == 0 or current_cards >= target_cards):
                     print(f"  🖼️  Intensive image loading for {cards_loaded} cards...")
-                    self.trigger_image_loading(driver, cards_loaded)
+                    self.trigger_image_loading(driver, cards_loaded, deadline)
                 
                 # Check for VIEW MORE early
                 if cards_loaded >= 8:
@@ -217,24 +174,25 @@ class CromaProductScraper:
         print(f"Early intervention completed: {cards_loaded} cards loaded in {scroll_steps} steps")
         return cards_loaded
     
-    def focus_on_image_loading(self, driver, total_cards, target_cards):
+    def focus_on_image_loading(self, driver, total_cards, target_cards, deadline=None):
         """Focus on loading images when too many cards are already loaded"""
         print(f"  🎯 Image loading focus: processing {min(total_cards, target_cards)} cards")
+        deadline = deadline or Deadline(self.scrape_deadline)
         
         # Use target_cards or less if we have fewer total cards
         cards_to_process = min(total_cards, target_cards)
         
-        # Scroll through existing cards slowly to trigger image loading
+        # Scroll through existing cards to trigger image loading
         card_height = 400  # Estimated height per card
         
         for i in range(1, cards_to_process + 1):
             scroll_to = i * card_height
             driver.execute_script(f"window.scrollTo(0, {scroll_to});")
-            time.sleep(1.5)  # Wait for images to load
+            # Wait until the cards scrolled past so far show real images
+            wait_for_images(driver, 0, i, deadline.remaining(self.step_timeout))
             
             if i % 3 == 0:
                 print(f"  🖼️  Processing card {i}: intensive image loading...")
-                time.sleep(2)  # Extra time for image loading
                 
                 # Check image loading progress
                 real_images, lazy_images = self.count_real_images(driver)
@@ -244,15 +202,18 @@ class CromaProductScraper:
         
         return cards_to_process
     
-    def trigger_image_loading(self, driver, card_count):
+    def trigger_image_loading(self, driver, card_count, deadline=None):
         """Trigger image loading for current cards by scrolling through them"""
         card_height = 400
+        deadline = deadline or Deadline(self.scrape_deadline)
         
-        # Scroll up and down through cards to trigger lazy loading
+        # Scroll through cards to trigger lazy loading, skipping cards that already have images
         for i in range(min(card_count, 10)):  # Process up to 10 cards
+            if wait_for_images(driver, i, i + 1, timeout=0.1):
+                continue
             scroll_to = i * card_height
             driver.execute_script(f"window.scrollTo(0, {scroll_to});")
-            time.sleep(0.8)
+            wait_for_images(driver, i, i + 1, deadline.remaining(self.step_timeout))
         
         # Check loading progress
         real_images, lazy_images = self.count_real_images(driver)
@@ -261,26 +222,31 @@ class CromaProductScraper:
             success_rate = (real_images / total_images) * 100
             print(f"     Image loading: {real_images}/{total_images} ({success_rate:.1f}%) loaded")
     
+    def resolve_card_images(self, driver, start=0, end=None, deadline=None):
+        """
+        Image URLs for the cards in [start, end), keyed by product_id.
+        URLs are derived from the card markup and page state without scrolling;
+        only cards where that fails are scrolled into view to trigger lazy loading.
+        """
+        deadline = deadline or Deadline(self.scrape_deadline)
+        images, unresolved = resolve_image_urls(driver, start, end, self.base_url)
+        print(f"  🖼️ Resolved {len(images)} image URLs without scrolling, {len(unresolved)} need scroll-loading")
+        
+        for index in unresolved:
+            if deadline.expired():
+                print("  ⏱️ Scrape deadline reached, stopping image loading")
+                break
+            scroll_card_into_view(driver, index)
+            wait_for_images(driver, index, index + 1, deadline.remaining(self.step_timeout))
+        
+        if unresolved:
+            images.update(resolve_image_urls(driver, start, end, self.base_url)[0])
+        return images
+    
     def count_real_images(self, driver):
         """Count products with actual image URLs (not lazy loaders)"""
-        images = driver.find_elements(By.CSS_SELECTOR, "li.product-item img")
-        real_images = 0
-        lazy_images = 0
-        
-        for img in images:
-            src = img.get_attribute("src") or ""
-            data_src = img.get_attribute("data-src") or ""
-            
-            # Check if it's a real image URL or lazy loader placeholder
-            if any(x in src.lower() for x in ['http', 'data:image', '.jpg', '.png', '.webp']):
-                if not any(x in src.lower() for x in ['lazy', 'placeholder', 'loading']):
-                    real_images += 1
-                else:
-                    lazy_images += 1
-            elif data_src:
-                lazy_images += 1
-            else:
-                lazy_images += 1
+        status = probe_image_status(driver)
+        real_images, lazy_images = status['real'], status['lazy']
         
         print(f"Images: {real_images} real, {lazy_images} lazy/placeholder")
         return real_images, lazy_images
@@ -288,43 +254,8 @@ class CromaProductScraper:
     def count_real_images_in_range(self, driver, start_index, end_index):
         """Count real images only within a specific range of products (for NEW products only)"""
         try:
-            # Find all product items
-            product_elements = driver.find_elements(By.CSS_SELECTOR, "li.product-item")
-            
-            # Get only the products in the specified range
-            target_products = product_elements[start_index:end_index]
-            
-            real_images = 0
-            lazy_images = 0
-            
-            for product in target_products:
-                try:
-                    # Find image within this specific product
-                    img_elements = product.find_elements(By.CSS_SELECTOR, "img")
-                    
-                    for img in img_elements:
-                        try:
-                            src = img.get_attribute('src') or ''
-                            data_src = img.get_attribute('data-src') or ''
-                            
-                            # Check if it's a real image URL or lazy loader placeholder
-                            if any(x in src.lower() for x in ['http', 'data:image', '.jpg', '.png', '.webp']):
-                                if not any(x in src.lower() for x in ['lazy', 'placeholder', 'loading']):
-                                    real_images += 1
-                                else:
-                                    lazy_images += 1
-                            elif data_src:
-                                lazy_images += 1
-                            else:
-                                lazy_images += 1
-                                
-                        except Exception:
-                            lazy_images += 1
-                            
-                except Exception:
-                    lazy_images += 1
-                    
-            return real_images, lazy_images
+            status = probe_image_status(driver, start_index, end_index)
+            return status['real'], status['lazy']
             
         except Exception as e:
             print(f"Error counting images in range: {e}")
@@ -332,29 +263,76 @@ class CromaProductScraper:
     
     def get_unique_product_ids(self, driver):
         """Get unique product identifiers to detect duplicates"""
-        products = driver.find_elements(By.CSS_SELECTOR, "li.product-item")
-        unique_ids = set()
+        return set(probe_product_ids(driver))
+    
+    def scrape_products(self, url, pages=1):
+        """Scrape listing products over plain HTTP, falling back to Selenium when that yields nothing"""
+        started = time.time()
+        try:
+            products = self.http_scraper.scrape(url, pages=pages)
+        except Exception as e:
+            print(f"HTTP fast path failed: {e}")
+            products = []
         
-        for product in products:
-            # Try multiple ways to get unique identifier
-            product_id = (
-                product.get_attribute("data-product-id") or
-                product.get_attribute("id") or
-                product.find_element(By.CSS_SELECTOR, "a").get_attribute("href") if product.find_elements(By.CSS_SELECTOR, "a") else ""
-            )
-            if product_id:
-                unique_ids.add(product_id)
+        if products:
+            print(f"⚡ HTTP fast path returned {len(products)} products in {time.time() - started:.2f}s")
+            return products
         
-        return unique_ids
+        print("HTTP fast path returned nothing, falling back to Selenium")
+        return self.scrape_with_selenium(url)
+    
+    def scrape_parallel(self, url, pages=4, workers=None, engine='http'):
+        """
+        Scrape `pages` listing pages in parallel worker processes.
+        Pages are split into contiguous ranges, one per worker; each worker uses its own
+        HTTP session ('http') or browser ('browser'). Results are merged in page order
+        and de-duplicated by product_id.
+        """
+        if pages < 1:
+            return []
+        workers = max(1, min(workers or os.cpu_count() or 1, pages))
+        page_numbers = list(range(pages))
+        chunk_size = -(-pages // workers)
+        page_ranges = [page_numbers[i:i + chunk_size] for i in range(0, pages, chunk_size)]
+        
+        print(f"🧵 Parallel scrape: {pages} pages in {len(page_ranges)} ranges across {workers} processes ({engine})")
+        started = time.time()
+        
+        results = []
+        # Spawned workers do not inherit this process's threads, Redis connections or browsers
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(_scrape_page_range, url, page_range, engine, self.http_scraper.config())
+                       for page_range in page_ranges]
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"❌ Parallel scrape worker failed: {e}")
+        
+        products = []
+        seen_ids = set()
+        for _, range_products in sorted(results, key=lambda result: result[0]):
+            for product in range_products:
+                if product['product_id'] not in seen_ids:
+                    seen_ids.add(product['product_id'])
+                    products.append(product)
+        
+        print(f"✅ Parallel scrape: {len(products)} unique products in {time.time() - started:.1f}s")
+        
+        if not products and engine == 'http':
+            print("HTTP workers returned nothing, retrying with browser workers")
+            return self.scrape_parallel(url, pages, workers, engine='browser')
+        return products
     
     def scrape_with_selenium(self, url):
         """Enhanced scraper with proper image loading and stopping conditions"""
-        driver = self.init_selenium_driver()
+        driver = self.driver_pool.acquire()
         if not driver:
             print("Failed to initialize Selenium driver")
             return []
         
         try:
+            deadline = Deadline(self.scrape_deadline)
             print(f"Loading page: {url}")
             driver.get(url)
             
@@ -369,7 +347,8 @@ class CromaProductScraper:
             
             # Immediate intervention - start scrolling before all cards load
             print("🚀 Starting early intervention to prevent bulk loading...")
-            final_card_count = self.scroll_with_early_intervention(driver, target_cards=12)
+            final_card_count = self.scroll_with_early_intervention(driver, target_cards=12, deadline=deadline,
+                                                                   load_images=not self.resolve_images)
             
             # Count real vs lazy images after gradual scroll
             real_images, lazy_images = self.count_real_images(driver)
@@ -385,31 +364,22 @@ class CromaProductScraper:
             else:
                 print(f"ℹ️  No VIEW MORE button found, proceeding with {final_card_count} cards")
             
-            # Wait a bit more for final image loading
-            print("Final wait for image loading...")
-            time.sleep(2)
-            
-            # Get final page source
-            page_source = driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Find all product items
-            product_items = soup.select('#product-list-back li.product-item')
-            if not product_items:
-                product_items = soup.select('ul.product-list li.product-item')
-            if not product_items:
-                product_items = soup.select('li.product-item')
+            images = None
+            if self.resolve_images:
+                images = self.resolve_card_images(driver, 0, None, deadline)
+            else:
+                # Wait for the remaining images of the loaded cards
+                print("Final wait for image loading...")
+                wait_for_images(driver, 0, final_card_count, deadline.remaining(self.step_timeout))
             
-            print(f"Final extraction: Found {len(product_items)} product items")
+            # Extract all loaded product cards
+            products = self.extract_loaded_products(driver)
+            if images:
+                apply_images(products, images)
             
-            # Extract products
-            products = []
-            
-            for index, item in enumerate(product_items):
-                product = self.extract_product_croma(item, index + 1)
-                if product:
-                    products.append(product)
-                    print(f"Extracted product {index + 1}: {product.get('title', 'Unknown')[:50]}...")
+            print(f"Final extraction: {len(products)} products ({self.extraction_mode} extraction)")
+            for index, product in enumerate(products):
+                print(f"Extracted product {index + 1}: {product.get('title', 'Unknown')[:50]}...")
             
             # Final image loading check
             final_real, final_lazy = self.count_real_images(driver)
@@ -429,19 +399,36 @@ class CromaProductScraper:
             traceback.print_exc()
             return []
         finally:
-            driver.quit()
+            self.driver_pool.release(driver)
     
-    def scrape_with_view_more(self, url):
-        """
-        Scrape additional products by clicking VIEW MORE button once
-        for the load-more functionality in the frontend
-        """
-        print("🔄 Starting VIEW MORE scraping session...")
+    def _find_view_more_button(self, driver):
+        """Look for VIEW MORE button with multiple strategies"""
+        view_more_selectors = [
+            "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view more')]",
+            "//button[contains(@class, 'view-more')]",
+            "//button[contains(@class, 'load-more')]", 
+            "//div[contains(@class, 'view-more')]//button",
+            "//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view more')]"
+        ]
         
-        driver = self.init_selenium_driver()
+        print("🔍 Looking for VIEW MORE button...")
+        for selector in view_more_selectors:
+            try:
+                elements = driver.find_elements(By.XPATH, selector)
+                for element in elements:
+                    if element.is_displayed() and element.is_enabled():
+                        print(f"✅ Found VIEW MORE button with selector: {selector}")
+                        return element
+            except Exception:
+                continue
+        return None
+    
+    def _open_view_more_session(self, url, deadline):
+        """Load the listing in a pooled browser that is kept for later load-more calls"""
+        driver = self.driver_pool.acquire()
         if not driver:
             print("Failed to initialize Selenium driver for VIEW MORE")
-            return []
+            return None
         
         try:
             print(f"Loading page for VIEW MORE: {url}")
@@ -449,113 +436,146 @@ class CromaProductScraper:
             
             # Wait for initial load
             print("⏳ Waiting for page to load...")
-            time.sleep(5)
+            wait_for_card_count(driver, 1, deadline.remaining(self.step_timeout * 2))
+            wait_for_network_idle(driver, deadline.remaining(self.step_timeout))
             
             # Scroll to load content first
             print("📜 Performing initial scroll to load content...")
             for i in range(3):
                 driver.execute_script("window.scrollBy(0, 800);")
-                time.sleep(1.5)
-            
-            # 🔥 COUNT ORIGINAL PRODUCTS BEFORE CLICKING VIEW MORE
-            original_products = driver.find_elements(By.CSS_SELECTOR, "li.product-item")
-            original_count = len(original_products)
-            print(f"📊 Original products on page: {original_count}")
-            
-            # Look for VIEW MORE button with multiple strategies
-            view_more_button = None
-            view_more_selectors = [
-                "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view more')]",
-                "//button[contains(@class, 'view-more')]",
-                "//button[contains(@class, 'load-more')]", 
-                "//div[contains(@class, 'view-more')]//button",
-                "//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'view more')]"
-            ]
-            
-            print("🔍 Looking for VIEW MORE button...")
-            for selector in view_more_selectors:
-                try:
-                    elements = driver.find_elements(By.XPATH, selector)
-                    for element in elements:
-                        if element.is_displayed() and element.is_enabled():
-                            view_more_button = element
-                            print(f"✅ Found VIEW MORE button with selector: {selector}")
-                            break
-                    if view_more_button:
-                        break
-                except Exception as e:
-                    continue
-            
-            if view_more_button:
-                # Scroll to button and click
-                print("👆 Clicking VIEW MORE button...")
-                driver.execute_script("arguments[0].scrollIntoView(true);", view_more_button)
-                time.sleep(2)
-                
-                try:
-                    # Try JavaScript click (more reliable)
-                    driver.execute_script("arguments[0].click();", view_more_button)
-                    print("✅ Successfully clicked VIEW MORE button")
-                except Exception as e:
-                    print(f"⚠️ Error clicking VIEW MORE: {e}")
-                    return []
-                
-                print("🔄 Waiting for new products to load...")
-                time.sleep(5)  # Wait for new content to load
-                
-                # 🔥 COUNT NEW PRODUCTS AFTER CLICKING VIEW MORE
-                new_products = driver.find_elements(By.CSS_SELECTOR, "li.product-item")
-                new_count = len(new_products)
-                added_count = new_count - original_count
-                print(f"📊 Products after VIEW MORE: {new_count} (added: {added_count})")
-                
-                if added_count > 0:
-                    # Use enhanced image loading ONLY for NEW products
-                    print("🖼️ Using enhanced image loading for NEW products only...")
-                    self.enhanced_image_loading_for_view_more(driver, original_count, new_count)
-                else:
-                    print("⚠️ No new products loaded after clicking VIEW MORE")
+                wait_for_network_idle(driver, deadline.remaining(self.step_timeout), idle_ms=300)
+        except Exception:
+            self.driver_pool.release(driver, discard=True)
+            raise
+        
+        # Cards already on the page were stored by the initial scrape
+        watermark = count_cards(driver)
+        print(f"📊 Original products on page: {watermark}")
+        return {"driver": driver, "url": url, "watermark": watermark, "seen_ids": set(), "last_used": time.time()}
+    
+    def close_view_more_session(self, discard=False):
+        """Hand the load-more browser back to the pool"""
+        with self._view_more_lock:
+            if self._view_more_timer:
+                self._view_more_timer.cancel()
+                self._view_more_timer = None
+            session, self._view_more_session = self._view_more_session, None
+            if session:
+                print("🧹 Closing VIEW MORE session...")
+                self.driver_pool.release(session["driver"], discard=discard)
+    
+    def _schedule_view_more_expiry(self):
+        if self._view_more_timer:
+            self._view_more_timer.cancel()
+        self._view_more_timer = threading.Timer(self.view_more_session_idle, self._expire_view_more_session)
+        self._view_more_timer.daemon = True
+        self._view_more_timer.start()
+    
+    def _expire_view_more_session(self):
+        """Timer callback: free the pool slot held by an idle load-more page"""
+        # A load-more call in progress keeps the session; it re-arms the timer when done
+        if not self._view_more_lock.acquire(blocking=False):
+            return
+        try:
+            session = self._view_more_session
+            if session and time.time() - session["last_used"] >= self.view_more_session_idle:
+                print(f"⏲️ VIEW MORE session idle for {self.view_more_session_idle}s")
+                self.close_view_more_session()
+        finally:
+            self._view_more_lock.release()
+    
+    def scrape_with_view_more(self, url):
+        """
+        Scrape additional products by clicking VIEW MORE button once
+        for the load-more functionality in the frontend.
+        The page stays open between calls; a watermark of cards already
+        extracted means each call only extracts the newly loaded batch.
+        """
+        with self._view_more_lock:
+            try:
+                return self._scrape_with_view_more(url)
+            finally:
+                if self._view_more_session:
+                    self._schedule_view_more_expiry()
+    
+    def _scrape_with_view_more(self, url):
+        print("🔄 Starting VIEW MORE scraping session...")
+        deadline = Deadline(self.scrape_deadline)
+        
+        session = self._view_more_session
+        if session and (session["url"] != url
+                        or time.time() - session["last_used"] > self.view_more_session_idle
+                        or not self.driver_pool.is_healthy(session["driver"])):
+            self.close_view_more_session(discard=session["url"] == url)
+            session = None
+        
+        try:
+            if session is None:
+                session = self._open_view_more_session(url, deadline)
+                if session is None:
                     return []
-                
+                self._view_more_session = session
             else:
+                print(f"♻️ Reusing VIEW MORE session ({session['watermark']} cards already extracted)")
+            
+            driver = session["driver"]
+            original_count = session["watermark"]
+            
+            view_more_button = self._find_view_more_button(driver)
+            if not view_more_button:
                 print("⚠️ No VIEW MORE button found - returning empty")
+                self.close_view_more_session()
                 return []
             
-            # Wait for final image processing
-            print("⏱️ Final wait for image processing...")
-            time.sleep(3)
+            # Scroll to button and click
+            print("👆 Clicking VIEW MORE button...")
+            driver.execute_script("arguments[0].scrollIntoView(true);", view_more_button)
+            wait_for_network_idle(driver, deadline.remaining(self.step_timeout), idle_ms=300)
             
-            # Get final page source and extract products
-            print("📊 Extracting NEW products only...")
-            page_source = driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            # JavaScript click (more reliable)
+            driver.execute_script("arguments[0].click();", view_more_button)
+            print("✅ Successfully clicked VIEW MORE button")
             
-            # Find all product items
-            product_items = soup.select('#product-list-back li.product-item')
-            if not product_items:
-                product_items = soup.select('ul.product-list li.product-item')
-            if not product_items:
-                product_items = soup.select('li.product-item')
+            print("🔄 Waiting for new products to load...")
+            wait_for_card_count(driver, original_count + 1, deadline.remaining(self.step_timeout * 2))
+            # Let the rest of the batch finish rendering
+            wait_for_network_idle(driver, deadline.remaining(self.step_timeout))
             
-            print(f"Found {len(product_items)} total product items")
+            new_count = count_cards(driver)
+            added_count = new_count - original_count
+            print(f"📊 Products after VIEW MORE: {new_count} (added: {added_count})")
             
-            # 🔥 ONLY EXTRACT NEW PRODUCTS (skip the original ones)
-            new_product_items = product_items[original_count:]  # Skip original products
-            print(f"📦 Extracting {len(new_product_items)} NEW products (skipping first {original_count})")
+            if added_count <= 0:
+                print("⚠️ No new products loaded after clicking VIEW MORE")
+                session["last_used"] = time.time()
+                return []
             
-            products = []
-            for index, item in enumerate(new_product_items):
-                product = self.extract_product_croma(item, original_count + index + 1)
-                if product:
-                    products.append(product)
-                    
-                    # Log progress every 6 products
-                    if (index + 1) % 6 == 0:
-                        print(f"📊 Progress: {index + 1}/{len(new_product_items)} NEW products processed")
+            images = None
+            if self.resolve_images:
+                print("🖼️ Resolving image URLs for NEW products only...")
+                images = self.resolve_card_images(driver, original_count, new_count, deadline)
+            else:
+                # Use enhanced image loading ONLY for NEW products
+                print("🖼️ Using enhanced image loading for NEW products only...")
+                self.enhanced_image_loading_for_view_more(driver, original_count, new_count, deadline)
+                
+                # Wait for final image processing
+                print("⏱️ Final wait for image processing...")
+                wait_for_images(driver, original_count, new_count, deadline.remaining(self.step_timeout))
+            
+            # 🔥 ONLY EXTRACT CARDS BEYOND THE WATERMARK
+            print(f"📦 Extracting NEW products (skipping first {original_count})")
+            batch = self.extract_loaded_products(driver, start=original_count)
+            if images:
+                apply_images(batch, images)
+            products = [p for p in batch if p["product_id"] not in session["seen_ids"]]
+            
+            session["seen_ids"].update(p["product_id"] for p in products)
+            session["watermark"] = new_count
+            session["last_used"] = time.time()
             
             # 🔥 CHECK IMAGE LOADING SUCCESS FOR NEW PRODUCTS ONLY
-            final_new_count = len(driver.find_elements(By.CSS_SELECTOR, "li.product-item"))
-            real_images, lazy_images = self.count_real_images_in_range(driver, original_count, final_new_count)
+            real_images, lazy_images = self.count_real_images_in_range(driver, original_count, new_count)
             success_rate = (real_images / (real_images + lazy_images) * 100) if (real_images + lazy_images) > 0 else 0
             
             print(f"🎯 VIEW MORE scraping completed:")
@@ -569,19 +589,17 @@ class CromaProductScraper:
             print(f"❌ VIEW MORE scraping failed: {e}")
             import traceback
             traceback.print_exc()
+            self.close_view_more_session(discard=True)
             return []
-            
-        finally:
-            print("🧹 Cleaning up VIEW MORE scraper...")
-            driver.quit()
     
-    def enhanced_image_loading_for_view_more(self, driver, start_index=0, end_index=None):
+    def enhanced_image_loading_for_view_more(self, driver, start_index=0, end_index=None, deadline=None):
         """
         Apply enhanced image loading to FULL page but track progress for NEW products only
         start_index: index of first new product 
         end_index: index of last product to process
         """
         print("  🎯 Starting enhanced image loading (full page for lazy loading compatibility)...")
+        deadline = deadline or Deadline(self.scrape_deadline)
         
         # Count current products
         current_products = driver.find_elements(By.CSS_SELECTOR, "li.product-item")
@@ -601,22 +619,24 @@ class CromaProductScraper:
         # Start from top and scroll through ALL products (lazy loading expects this)
         print("  🔄 Starting from top for proper lazy loading sequence...")
         driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(1)
         
         # First pass - scroll through ALL products (but focus on triggering NEW ones)
         for i in range(1, min(total_products + 1, 50)):  # Process up to 50 products total
+            if deadline.expired():
+                print("  ⏱️ Scrape deadline reached, stopping image loading")
+                break
             scroll_to = i * card_height
             driver.execute_script(f"window.scrollTo(0, {scroll_to});")
-            time.sleep(1.2)  # Slightly faster since we're doing more products
+            # Wait for the card now in view to get its real image
+            wait_for_images(driver, i - 1, i, deadline.remaining(self.step_timeout))
             
             # Intensive image loading checkpoints - focus on NEW products area
             if i >= start_index and i % 3 == 0:
                 new_card_number = i - start_index
                 print(f"  🖼️ NEW Product Area - Card {new_card_number}: Image loading checkpoint...")
-                time.sleep(2)  # Extra pause for image loading
                 
                 # Trigger image loading for current viewport
-                self.trigger_image_loading_view_more(driver, i)
+                self.trigger_image_loading_view_more(driver, i, deadline)
                 
                 # Check progress for NEW products only
                 real_images, lazy_images = self.count_real_images_in_range(driver, start_index, end_index)
@@ -628,13 +648,15 @@ class CromaProductScraper:
         # Second pass - focus specifically on NEW products area
         print("  🔄 Second pass: intensive focus on NEW products area...")
         for i in range(start_index, min(end_index, start_index + 20)):  # Focus on NEW products
+            # Only revisit cards whose image is still a placeholder
+            if deadline.expired() or wait_for_images(driver, i, i + 1, timeout=0.1):
+                continue
             scroll_to = (i + 1) * card_height
             driver.execute_script(f"window.scrollTo(0, {scroll_to});")
-            time.sleep(1.0)
             
             # Extra trigger for problematic images
-            if i % 2 == 0:  # Every other product
-                self.trigger_image_loading_view_more(driver, i + 1)
+            if not wait_for_images(driver, i, i + 1, deadline.remaining(self.step_timeout)):
+                self.trigger_image_loading_view_more(driver, i + 1, deadline)
         
         # Final image loading check for NEW products only
         final_real, final_lazy = self.count_real_images_in_range(driver, start_index, end_index)
@@ -645,11 +667,12 @@ class CromaProductScraper:
         else:
             print("  ⚠️ No images found in NEW products range")
     
-    def trigger_image_loading_view_more(self, driver, current_card):
+    def trigger_image_loading_view_more(self, driver, current_card, deadline=None):
         """
         Trigger image loading using the same technique as initial scraper
         """
         card_height = 400
+        deadline = deadline or Deadline(self.scrape_deadline)
         
         # Scroll up and down around current position to trigger lazy loading
         base_position = current_card * card_height
@@ -666,20 +689,23 @@ class CromaProductScraper:
         for pos in positions:
             if pos >= 0:  # Don't scroll to negative positions
                 driver.execute_script(f"window.scrollTo(0, {pos});")
-                time.sleep(0.3)  # Quick movements to trigger loading
+                # Stop jiggling as soon as the card's image has loaded
+                if wait_for_images(driver, current_card - 1, current_card, deadline.remaining(0.3)):
+                    break
     
     def scrape_page_elements(self, url):
         """Scrape page elements for debugging"""
-        driver = self.init_selenium_driver()
+        driver = self.driver_pool.acquire()
         if not driver:
             return {}
         
         try:
             driver.get(url)
-            time.sleep(5)
+            wait_for_card_count(driver, 1, self.step_timeout * 2)
+            wait_for_network_idle(driver, self.step_timeout)
             
             page_source = driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
+            soup = self.listing_parser.build_soup(page_source)
             
             # Get page structure info
             product_items_main = soup.select('#product-list-back li.product-item')
@@ -703,7 +729,7 @@ class CromaProductScraper:
             print(f"Error scraping page elements: {e}")
             return {}
         finally:
-            driver.quit()
+            self.driver_pool.release(driver)
     
     def get_sample_data(self):
         """Generate sample data for testing"""
@@ -727,11 +753,11 @@ class CromaProductScraper:
     def store_in_redis(self, data):
         """Store scraped data in Redis"""
         try:
-            # Store just the products list
-            self.redis_client.set("products", json.dumps(data['products']))
+            # Store each product under its own key
+            self.store.replace_all(data['products'])
             
-            # Store complete data with metadata
-            self.redis_client.set("scraped_content", json.dumps(data))
+            # Store metadata alongside
+            self.store.save_metadata(data)
             
             print(f"Stored {len(data['products'])} products in Redis")
             return True
@@ -739,6 +765,40 @@ class CromaProductScraper:
             print(f"Error storing data in Redis: {e}")
             return False
 
+def listing_page_url(url, page):
+    """Listing URL for a page number; page 0 is the plain category URL"""
+    if not page:
+        return url
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query['page'] = str(page)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+def _scrape_page_range(url, page_range, engine, http_config=None):
+    """Process-pool task: scrape a contiguous range of listing pages, stopping at the first empty one"""
+    products = []
+    if engine == 'http':
+        http_scraper = CromaHttpScraper(**(http_config or {}))
+        try:
+            for page in page_range:
+                page_products = http_scraper.fetch_listing_page(url, page)
+                if not page_products:
+                    break
+                products.extend(page_products)
+        finally:
+            http_scraper.close()
+    else:
+        scraper = CromaProductScraper()
+        try:
+            for page in page_range:
+                page_products = scraper.scrape_with_selenium(listing_page_url(url, page))
+                if not page_products:
+                    break
+                products.extend(page_products)
+        finally:
+            scraper.driver_pool.close_all()
+    return page_range[0], products
+
 def scrape_croma_products():
     """Main scraping function"""
     scraper = CromaProductScraper()
@@ -760,7 +820,7 @@ def scrape_croma_products():
     
     # Scrape products
     print("\n--- Scraping products ---")
-    products = scraper.scrape_with_selenium(url)
+    products = scraper.scrape_products(url)
     
     if not products:
         print("No products found. Using sample data for testing.")
@@ -0,0 +1,145 @@
+import re
+import logging
+from serialization import to_str
+
+logger = logging.getLogger(__name__)
+
+TERM_KEY_PREFIX = "search:term:"
+DOC_KEY_PREFIX = "search:doc:"
+TERMS_REGISTRY_KEY = "search:terms"
+QUERY_CACHE_PREFIX = "search:query:"
+QUERY_CACHE_TTL = 60
+# Bumped when the indexed terms change, so ensure_search_index rebuilds old indexes
+INDEX_SCHEMA_KEY = "search:schema"
+INDEX_SCHEMA_VERSION = "2"
+
+# Shortest prefix indexed for partial-word matches ("ol" -> "oled", "5" -> "55")
+MIN_PREFIX_LENGTH = 1
+
+# Catalog positions are folded into result scores as a fraction below one relevance
+# step, so equally relevant products come back in catalog order
+ORDER_TIEBREAK_SCALE = 1e9
+
+# Relevance weights: brand matches count more than title matches,
+# whole-word matches more than prefix matches
+FIELD_WEIGHTS = {"brand": 3.0, "title": 1.0}
+EXACT_MATCH_WEIGHT = 2.0
+PREFIX_MATCH_WEIGHT = 1.0
+
+# Letters and digits are split so "55in" matches "55 inch" and "4K" matches "4k"
+TOKEN_RE = re.compile(r'[a-z]+|\d+')
+
+
+def tokenize(text):
+    """Split text into lowercase letter and digit runs"""
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def document_terms(product):
+    """Build the weighted term -> score map indexed for one product"""
+    terms = {}
+    for field, field_weight in FIELD_WEIGHTS.items():
+        for token in tokenize(product.get(field, '')):
+            exact = field_weight * EXACT_MATCH_WEIGHT
+            terms[token] = max(terms.get(token, 0), exact)
+            for length in range(MIN_PREFIX_LENGTH, len(token)):
+                prefix = token[:length]
+                terms[prefix] = max(terms.get(prefix, 0), field_weight * PREFIX_MATCH_WEIGHT)
+    return terms
+
+
+class SearchIndex:
+    """
+    Inverted token index kept in Redis.
+    Every term (whole token or prefix) maps to a sorted set of product_id -> relevance,
+    so a query intersects a handful of posting lists instead of scanning the catalog.
+    With `order_key` (the catalog order sorted set) ties are broken by catalog order.
+    """
+
+    def __init__(self, redis_client, order_key=None):
+        self.redis = redis_client
+        self.order_key = order_key
+
+    def term_key(self, term):
+        return f"{TERM_KEY_PREFIX}{term}"
+
+    def doc_key(self, product_id):
+        return f"{DOC_KEY_PREFIX}{product_id}"
+
+    def index_products(self, pipe, products):
+        """Queue postings for the given products on an existing pipeline"""
+        for product in products:
+            product_id = product['product_id']
+            terms = document_terms(product)
+            if not terms:
+                continue
+            for term, score in terms.items():
+                pipe.zadd(self.term_key(term), {product_id: score})
+            pipe.sadd(self.doc_key(product_id), *terms.keys())
+            pipe.sadd(TERMS_REGISTRY_KEY, *terms.keys())
+        pipe.set(INDEX_SCHEMA_KEY, INDEX_SCHEMA_VERSION)
+
+    def clear(self, pipe, product_ids):
+        """Queue removal of the whole index on an existing pipeline"""
+        terms = [to_str(t) for t in self.redis.smembers(TERMS_REGISTRY_KEY)]
+        if terms:
+            pipe.delete(*[self.term_key(t) for t in terms])
+        if product_ids:
+            pipe.delete(*[self.doc_key(pid) for pid in product_ids])
+        pipe.delete(TERMS_REGISTRY_KEY, INDEX_SCHEMA_KEY)
+
+    def remove_products(self, pipe, product_ids):
+        """Queue removal of the postings of individual products on an existing pipeline"""
+        if not product_ids:
+            return
+        read = self.redis.pipeline(transaction=False)
+        for product_id in product_ids:
+            read.smembers(self.doc_key(product_id))
+        for product_id, terms in zip(product_ids, read.execute()):
+            for term in terms:
+                pipe.zrem(self.term_key(to_str(term)), product_id)
+        pipe.delete(*[self.doc_key(pid) for pid in product_ids])
+
+    def is_empty(self):
+        return not self.redis.exists(TERMS_REGISTRY_KEY)
+
+    def is_current(self):
+        """False for empty indexes and ones built with an older term schema"""
+        return to_str(self.redis.get(INDEX_SCHEMA_KEY)) == INDEX_SCHEMA_VERSION
+
+    def rebuild(self, products):
+        """Rebuild the index from scratch (used for catalogs stored before indexing existed)"""
+        pipe = self.redis.pipeline(transaction=True)
+        self.clear(pipe, [p['product_id'] for p in products if p.get('product_id')])
+        self.index_products(pipe, [p for p in products if p.get('product_id')])
+        pipe.execute()
+        logger.info(f"Rebuilt search index for {len(products)} products")
+
+    def search(self, query, offset=0, limit=20, cache_token=None):
+        """
+        Return (product_ids, total_results) ranked by relevance.
+        Every query token must match a whole token or a token prefix.
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return [], 0
+
+        keys = {self.term_key(t): 1 for t in terms}
+        if self.order_key:
+            keys[self.order_key] = -1 / ORDER_TIEBREAK_SCALE
+        if len(keys) == 1:
+            result_key = next(iter(keys))
+        else:
+            # Intersections are cached per catalog version so paging is cheap
+            result_key = f"{QUERY_CACHE_PREFIX}{cache_token}:{' '.join(terms)}"
+            if not self.redis.exists(result_key):
+                pipe = self.redis.pipeline(transaction=True)
+                pipe.zinterstore(result_key, keys, aggregate='SUM')
+                pipe.expire(result_key, QUERY_CACHE_TTL)
+                pipe.execute()
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrevrange(result_key, offset, offset + limit - 1)
+        pipe.zcard(result_key)
+        ids, total = pipe.execute()
+        return [to_str(pid) for pid in ids], total
@@ -0,0 +1,198 @@
+import json
+import os
+import zlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMAT_JSON = "json"
+FORMAT_MSGPACK = "msgpack"
+
+COMPRESSION_NONE = "none"
+COMPRESSION_ZLIB = "zlib"
+COMPRESSION_ZSTD = "zstd"
+
+# Tagged payloads start with a NUL byte, which never starts a JSON document,
+# so untagged values written before the tag existed keep decoding as JSON
+MSGPACK_TAG = b"\x00M1"
+ZLIB_TAG = b"\x00Z1"
+ZSTD_TAG = b"\x00S1"
+
+# Preset dictionary of strings every product value repeats, so even a single
+# ~600 byte product compresses well. Values are written against this exact
+# content: changing it needs new tags (Z2/S2), never an edit in place.
+PRODUCT_DICTIONARY = (
+    b'"offers":["No Cost EMI","Bank Offer","Extra Discount"],"availability":"Standard Delivery by Tomorrow",'
+    b'"image":"https://media.croma.com/image/upload/v1/Croma%20Assets/Entertainment/Television/Images/",'
+    b'"url":"https://www.croma.com/","current_price":"\xe2\x82\xb9","original_price":"\xe2\x82\xb9",'
+    b'"discount":"% Off","rating":"4.","review_count":"","price_paise":,"original_price_paise":,'
+    b'"discount_percent":,"rating_value":,"review_count_value":,"brand":"","title":" cm (55 inch) 4K Ultra HD '
+    b'LED Smart Google TV with Dolby Vision","product_id":"'
+)
+
+_zstd_dictionary = (zstandard.ZstdCompressionDict(PRODUCT_DICTIONARY, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+                    if zstandard is not None else None)
+
+
+def to_str(value):
+    """Normalize Redis replies so readers work with or without decode_responses"""
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def dumps(obj):
+    """Serialize to a JSON string, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+
+def loads(data):
+    """Parse a JSON str or bytes value"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compress(payload, compression):
+    """Compress an encoded payload and tag it with the codec"""
+    if compression == COMPRESSION_ZLIB:
+        compressor = zlib.compressobj(6, zdict=PRODUCT_DICTIONARY)
+        return ZLIB_TAG + compressor.compress(payload) + compressor.flush()
+    if compression == COMPRESSION_ZSTD:
+        return ZSTD_TAG + zstandard.ZstdCompressor(level=3, dict_data=_zstd_dictionary).compress(payload)
+    return payload
+
+
+def decompress(data):
+    """Undo compress(); untagged data is returned as is"""
+    if isinstance(data, bytes):
+        if data.startswith(ZLIB_TAG):
+            decompressor = zlib.decompressobj(zdict=PRODUCT_DICTIONARY)
+            return decompressor.decompress(data[len(ZLIB_TAG):]) + decompressor.flush()
+        if data.startswith(ZSTD_TAG):
+            if zstandard is None:
+                raise ValueError("zstd payload found but zstandard is not installed")
+            return zstandard.ZstdDecompressor(dict_data=_zstd_dictionary).decompress(data[len(ZSTD_TAG):])
+    return data
+
+
+def encode(obj, payload_format=FORMAT_JSON, compression=COMPRESSION_NONE):
+    """Encode a value for Redis in the given format, optionally compressed"""
+    if payload_format == FORMAT_MSGPACK:
+        payload = MSGPACK_TAG + msgpack.packb(obj, use_bin_type=True)
+    elif orjson is not None:
+        payload = orjson.dumps(obj)
+    else:
+        payload = json.dumps(obj).encode('utf-8')
+    return compress(payload, compression)
+
+
+def decode(data):
+    """Decode a Redis value written by encode(), whatever its format and compression"""
+    data = decompress(data)
+    if isinstance(data, bytes) and data.startswith(MSGPACK_TAG):
+        if msgpack is None:
+            raise ValueError("msgpack payload found but msgpack is not installed")
+        return msgpack.unpackb(data[len(MSGPACK_TAG):], raw=False)
+    return loads(data)
+
+
+def to_columns(products):
+    """
+    Columnar form of a product list: one value list per field, plus the rows
+    where a field is absent so the dicts round-trip exactly.
+    """
+    fields = []
+    for product in products:
+        for field in product:
+            if field not in fields:
+                fields.append(field)
+    columns = {field: [] for field in fields}
+    missing = {}
+    for row, product in enumerate(products):
+        for field in fields:
+            if field in product:
+                columns[field].append(product[field])
+            else:
+                columns[field].append(None)
+                missing.setdefault(field, []).append(row)
+    return {"rows": len(products), "fields": fields, "columns": columns, "missing": missing}
+
+
+def from_columns(table):
+    """Rebuild the product list from to_columns() output"""
+    products = [{} for _ in range(table["rows"])]
+    for field in table["fields"]:
+        absent = set(table["missing"].get(field, ()))
+        for row, value in enumerate(table["columns"][field]):
+            if row not in absent:
+                products[row][field] = value
+    return products
+
+
+def _decodes_responses(redis_client):
+    return redis_client.connection_pool.connection_kwargs.get("decode_responses", False)
+
+
+def payload_format_for(redis_client):
+    """
+    Storage format for a client: REDIS_PAYLOAD_FORMAT if set, else msgpack when
+    installed. Clients with decode_responses=True cannot read binary values,
+    so they always get JSON.
+    """
+    payload_format = os.environ.get("REDIS_PAYLOAD_FORMAT") or (FORMAT_MSGPACK if msgpack else FORMAT_JSON)
+    if payload_format not in (FORMAT_JSON, FORMAT_MSGPACK):
+        raise ValueError(f"Unknown payload format '{payload_format}'")
+    if payload_format == FORMAT_MSGPACK and (msgpack is None or _decodes_responses(redis_client)):
+        return FORMAT_JSON
+    return payload_format
+
+
+def compression_for(redis_client):
+    """
+    Compression for a client: REDIS_PAYLOAD_COMPRESSION if set, else zstd when
+    installed, else zlib. Like msgpack, never used with decode_responses=True.
+    """
+    compression = os.environ.get("REDIS_PAYLOAD_COMPRESSION") or (COMPRESSION_ZSTD if zstandard else COMPRESSION_ZLIB)
+    if compression not in (COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_ZSTD):
+        raise ValueError(f"Unknown payload compression '{compression}'")
+    if _decodes_responses(redis_client):
+        return COMPRESSION_NONE
+    if compression == COMPRESSION_ZSTD and zstandard is None:
+        return COMPRESSION_ZLIB
+    return compression
+
+
+def install_flask_json(app):
+    """Make jsonify and request.get_json use orjson when it is installed"""
+    if orjson is None:
+        return
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            option = orjson.OPT_NON_STR_KEYS
+            if kwargs.get("indent"):
+                option |= orjson.OPT_INDENT_2
+            if kwargs.get("sort_keys", self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
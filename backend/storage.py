@@ -0,0 +1,318 @@
+import json
+import logging
+import time
+import serialization
+from serialization import to_str
+from price_history import PriceHistory
+from product_fields import content_hash
+from search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_KEY_PREFIX = "product:"
+PRODUCT_ORDER_KEY = "products:order"
+PRODUCT_SEQ_KEY = "products:seq"
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_UPDATED_KEY = "catalog:updated_at"
+PRODUCT_HASHES_KEY = "products:hashes"
+# Ids last seen by each scrape scope (e.g. one listing page), and the set of scope keys
+PRODUCT_SCOPE_PREFIX = "products:scope:"
+PRODUCT_SCOPES_KEY = "products:scopes"
+# Redis stream of product_id + change type, for caches and downstream consumers
+CHANGE_STREAM_KEY = "catalog:changes"
+CHANGE_STREAM_MAXLEN = 10000
+
+CHANGE_ADDED = "added"
+CHANGE_UPDATED = "updated"
+CHANGE_REMOVED = "removed"
+LEGACY_PRODUCTS_KEY = "products"
+SCRAPE_METADATA_KEY = "scraped_content"
+
+
+class ProductStore:
+    """
+    Per-product Redis storage.
+    Each product lives under its own key (product:<product_id>) and a sorted set
+    (products:order) keeps the insertion order, so single lookups are O(1) and
+    paginated reads only fetch the requested slice.
+    """
+
+    def __init__(self, redis_client, image_cache=None):
+        self.redis = redis_client
+        # When set, product images are rewritten to /images/<key> before storing
+        self.image_cache = image_cache
+        # msgpack (tagged) or JSON product values, compressed; readers accept every combination
+        self.payload_format = serialization.payload_format_for(redis_client)
+        self.compression = serialization.compression_for(redis_client)
+        self.search_index = SearchIndex(redis_client, order_key=PRODUCT_ORDER_KEY)
+        self.price_history = PriceHistory(redis_client)
+
+    def product_key(self, product_id):
+        return f"{PRODUCT_KEY_PREFIX}{product_id}"
+
+    def encode(self, product):
+        return serialization.encode(product, self.payload_format, self.compression)
+
+    def _unique(self, products):
+        """Products with a product_id, first occurrence of each id only"""
+        unique = []
+        seen_ids = set()
+        for product in products:
+            product_id = product.get('product_id')
+            if not product_id or product_id in seen_ids:
+                continue
+            seen_ids.add(product_id)
+            unique.append(product)
+        return unique
+
+    def _stored_hashes(self, product_ids):
+        if not product_ids:
+            return {}
+        hashes = self.redis.hmget(PRODUCT_HASHES_KEY, product_ids)
+        return {pid: to_str(h) for pid, h in zip(product_ids, hashes) if h is not None}
+
+    def _queue_changes(self, pipe, version, changes):
+        """Append one change-feed entry per added/updated/removed product"""
+        for change_type in (CHANGE_ADDED, CHANGE_UPDATED):
+            for product in changes[change_type]:
+                pipe.xadd(CHANGE_STREAM_KEY, {"product_id": product['product_id'], "change": change_type,
+                                              "version": version}, maxlen=CHANGE_STREAM_MAXLEN, approximate=True)
+        for product_id in changes[CHANGE_REMOVED]:
+            pipe.xadd(CHANGE_STREAM_KEY, {"product_id": product_id, "change": CHANGE_REMOVED,
+                                          "version": version}, maxlen=CHANGE_STREAM_MAXLEN, approximate=True)
+
+    def replace_all(self, products):
+        """
+        Make the catalog match the given products (initial scrape).
+        Products are compared by content hash: only added, changed and removed
+        ones are written, and each change is published to the change feed.
+        """
+        stored, _ = self.sync_products(products, replace=True)
+        return stored
+
+    def add_products(self, products):
+        """
+        Append products that are not stored yet and update changed ones in place.
+        Returns only the newly added products, in the order given.
+        """
+        _, changes = self.sync_products(products, replace=False)
+        return changes[CHANGE_ADDED]
+
+    def scope_key(self, scope):
+        return f"{PRODUCT_SCOPE_PREFIX}{scope}"
+
+    def _scope_removals(self, scope, product_ids):
+        """
+        Products the scope listed last time but not now, and that no other scope
+        still lists. Products never seen by any scope are left alone.
+        """
+        scope_key = self.scope_key(scope)
+        previous = [to_str(pid) for pid in self.redis.smembers(scope_key)]
+        dropped = [pid for pid in previous if pid not in product_ids]
+        if not dropped:
+            return []
+        others = [key for key in (to_str(k) for k in self.redis.smembers(PRODUCT_SCOPES_KEY)) if key != scope_key]
+        still_listed = {to_str(pid) for pid in self.redis.sunion(others)} if others else set()
+        pipe = self.redis.pipeline(transaction=False)
+        candidates = [pid for pid in dropped if pid not in still_listed]
+        for product_id in candidates:
+            pipe.zscore(PRODUCT_ORDER_KEY, product_id)
+        return [pid for pid, score in zip(candidates, pipe.execute()) if score is not None]
+
+    def _record_scope(self, scope, product_ids):
+        scope_key = self.scope_key(scope)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(scope_key)
+        if product_ids:
+            pipe.sadd(scope_key, *product_ids)
+        pipe.sadd(PRODUCT_SCOPES_KEY, scope_key)
+        pipe.execute()
+
+    def sync_products(self, products, replace=False, scope=None):
+        """
+        Write the delta between the given products and the stored catalog.
+        With replace=True products missing from the input are removed and the
+        catalog takes the input order; otherwise new products are appended.
+        With a scope (e.g. one listing page) only products that scope listed
+        before and no longer does are removed.
+        Returns (unique input products, {added, updated, removed} changes).
+        """
+        stored = self._unique(products)
+        if self.image_cache:
+            self.image_cache.localize(stored)
+        hashes = {p['product_id']: content_hash(p) for p in stored}
+        old_hashes = self._stored_hashes(list(hashes))
+
+        changes = {CHANGE_ADDED: [], CHANGE_UPDATED: [], CHANGE_REMOVED: []}
+        for product in stored:
+            old_hash = old_hashes.get(product['product_id'])
+            if old_hash is None:
+                changes[CHANGE_ADDED].append(product)
+            elif old_hash != hashes[product['product_id']]:
+                changes[CHANGE_UPDATED].append(product)
+
+        order_changed = False
+        if replace:
+            old_ids = [to_str(pid) for pid in self.redis.zrange(PRODUCT_ORDER_KEY, 0, -1)]
+            changes[CHANGE_REMOVED] = [pid for pid in old_ids if pid not in hashes]
+            order_changed = old_ids != [p['product_id'] for p in stored]
+            old_id_set = set(old_ids)
+            in_catalog = [p['product_id'] in old_id_set for p in changes[CHANGE_ADDED]]
+        else:
+            pipe = self.redis.pipeline(transaction=False)
+            for product in changes[CHANGE_ADDED]:
+                pipe.zscore(PRODUCT_ORDER_KEY, product['product_id'])
+            in_catalog = [score is not None for score in pipe.execute()]
+            if scope:
+                changes[CHANGE_REMOVED] = self._scope_removals(scope, hashes)
+
+        # Products written before hashing existed have no hash but are already in the catalog
+        if any(in_catalog):
+            unhashed = changes[CHANGE_ADDED]
+            changes[CHANGE_ADDED] = [p for p, found in zip(unhashed, in_catalog) if not found]
+            changes[CHANGE_UPDATED] += [p for p, found in zip(unhashed, in_catalog) if found]
+
+        if not (changes[CHANGE_ADDED] or changes[CHANGE_UPDATED] or changes[CHANGE_REMOVED] or order_changed):
+            logger.info(f"Catalog unchanged ({len(stored)} products checked)")
+            if scope:
+                self._record_scope(scope, list(hashes))
+            return stored, changes
+
+        written = changes[CHANGE_ADDED] + changes[CHANGE_UPDATED]
+        # Postings of rewritten and removed products are dropped before re-indexing
+        reindexed_ids = [p['product_id'] for p in changes[CHANGE_UPDATED]] + changes[CHANGE_REMOVED]
+
+        start = None
+        if not replace and changes[CHANGE_ADDED]:
+            # Reserve a contiguous block of positions at the end of the catalog
+            end = self.redis.incrby(PRODUCT_SEQ_KEY, len(changes[CHANGE_ADDED]))
+            start = end - len(changes[CHANGE_ADDED])
+
+        pipe = self.redis.pipeline(transaction=True)
+        if changes[CHANGE_REMOVED]:
+            pipe.delete(*[self.product_key(pid) for pid in changes[CHANGE_REMOVED]])
+            pipe.hdel(PRODUCT_HASHES_KEY, *changes[CHANGE_REMOVED])
+        self.search_index.remove_products(pipe, reindexed_ids)
+        if written:
+            pipe.mset({self.product_key(p['product_id']): self.encode(p) for p in written})
+            pipe.hset(PRODUCT_HASHES_KEY, mapping={p['product_id']: hashes[p['product_id']] for p in written})
+            self.search_index.index_products(pipe, written)
+
+        if replace:
+            if order_changed:
+                pipe.delete(PRODUCT_ORDER_KEY)
+                if stored:
+                    pipe.zadd(PRODUCT_ORDER_KEY, {p['product_id']: position for position, p in enumerate(stored)})
+            pipe.set(PRODUCT_SEQ_KEY, len(stored))
+        else:
+            if start is not None:
+                pipe.zadd(PRODUCT_ORDER_KEY, {p['product_id']: start + i for i, p in enumerate(changes[CHANGE_ADDED])})
+            if changes[CHANGE_REMOVED]:
+                pipe.zrem(PRODUCT_ORDER_KEY, *changes[CHANGE_REMOVED])
+
+        pipe.set(CATALOG_UPDATED_KEY, int(time.time()))
+        pipe.incr(CATALOG_VERSION_KEY)
+        version = pipe.execute()[-1]
+        if scope:
+            self._record_scope(scope, list(hashes))
+
+        # The feed is written after the data so consumers never see a change before it is readable
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_changes(pipe, version, changes)
+        pipe.execute()
+
+        # Only added/updated products can carry a new price; unchanged ones are not even looked at
+        self.price_history.record(written)
+
+        logger.info(f"Stored {len(stored)} products: {len(changes[CHANGE_ADDED])} added, "
+                    f"{len(changes[CHANGE_UPDATED])} updated, {len(changes[CHANGE_REMOVED])} removed")
+        return stored, changes
+
+    def get_version(self):
+        """Catalog version counter, bumped on every write; None if never written"""
+        version = self.redis.get(CATALOG_VERSION_KEY)
+        return int(version) if version is not None else None
+
+    def get_version_info(self):
+        """(version, unix time of the last catalog change) in one round-trip; either may be None"""
+        version, updated_at = self.redis.mget([CATALOG_VERSION_KEY, CATALOG_UPDATED_KEY])
+        return (int(version) if version is not None else None,
+                int(updated_at) if updated_at is not None else None)
+
+    def count(self):
+        return self.redis.zcard(PRODUCT_ORDER_KEY)
+
+    def get_product(self, product_id):
+        data = self.redis.get(self.product_key(product_id))
+        return serialization.decode(data) if data else None
+
+    def get_many(self, product_ids):
+        """Fetch several products in one round-trip, preserving order"""
+        if not product_ids:
+            return []
+        values = self.redis.mget([self.product_key(pid) for pid in product_ids])
+        return [serialization.decode(v) for v in values if v]
+
+    def get_page(self, offset, limit):
+        """Fetch `limit` products starting at position `offset`"""
+        if limit <= 0:
+            return []
+        ids = [to_str(pid) for pid in self.redis.zrange(PRODUCT_ORDER_KEY, offset, offset + limit - 1)]
+        return self.get_many(ids)
+
+    def iter_products(self, batch_size=500):
+        """Yield every product in catalog order, one batch of keys at a time"""
+        offset = 0
+        while True:
+            ids = [to_str(pid) for pid in self.redis.zrange(PRODUCT_ORDER_KEY, offset, offset + batch_size - 1)]
+            if not ids:
+                return
+            # A batch whose keys all vanished mid-read is skipped, not taken as the end
+            yield from self.get_many(ids)
+            offset += batch_size
+
+    def get_all(self):
+        return list(self.iter_products())
+
+    def save_metadata(self, metadata):
+        """Store scrape metadata; the products themselves live under their own keys"""
+        metadata = {k: v for k, v in metadata.items() if k != "products"}
+        metadata["products_ref"] = PRODUCT_ORDER_KEY
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(SCRAPE_METADATA_KEY, serialization.dumps(metadata))
+        # Metadata is part of what clients cache, so it moves Last-Modified too
+        pipe.set(CATALOG_UPDATED_KEY, int(time.time()))
+        pipe.execute()
+        return metadata
+
+    def get_metadata(self):
+        """Scrape metadata, or None; old entries may still embed the full product list"""
+        data = self.redis.get(SCRAPE_METADATA_KEY)
+        return serialization.loads(data) if data else None
+
+    def search(self, query, offset=0, limit=20):
+        """Return (products, total_results) for a query, most relevant first"""
+        product_ids, total = self.search_index.search(query, offset, limit, cache_token=self.get_version())
+        return self.get_many(product_ids), total
+
+    def ensure_search_index(self):
+        """Build the search index for a catalog stored before indexing existed, or with older terms"""
+        if self.count() and not self.search_index.is_current():
+            self.search_index.rebuild(self.get_all())
+
+    def migrate_legacy_blob(self):
+        """Import the old monolithic "products" JSON blob if the store is still empty"""
+        if self.count():
+            return 0
+        legacy = self.redis.get(LEGACY_PRODUCTS_KEY)
+        if not legacy:
+            return 0
+        try:
+            products = serialization.loads(legacy)
+        except json.JSONDecodeError:
+            logger.error("Legacy products blob is not valid JSON, skipping migration")
+            return 0
+        stored = self.replace_all(products)
+        self.redis.delete(LEGACY_PRODUCTS_KEY)
+        logger.info(f"Migrated {len(stored)} products from legacy blob")
+        return len(stored)
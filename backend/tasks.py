@@ -0,0 +1,188 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from scheduler import DEFAULT_INTERVAL, page_id, record_page_failure, record_page_scrape
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATEGORY_URL = "https://www.croma.com/televisions-accessories/c/997"
+
+
+def _no_progress(message):
+    pass
+
+
+def _prefetch_images(store, products, progress):
+    """Warm the image cache so the first page view does not wait on the CDN"""
+    if not store.image_cache or not products:
+        return
+    progress(f"Caching images for {len(products)} products")
+    try:
+        fetched = store.image_cache.prefetch(products)
+        logger.info(f"🖼️ Cached {fetched} product images")
+    except Exception as e:
+        logger.warning(f"Image prefetch failed: {e}")
+
+
+def full_scrape_scope(url):
+    """Scope of a full listing scrape; scheduled page refreshes use scheduler.page_id"""
+    return f"{url}|full"
+
+
+def auto_scrape_products(scraper, store, redis_client, url=DEFAULT_CATEGORY_URL, pages=1, progress=_no_progress):
+    """
+    Scrape the listing from scratch and sync it into the catalog.
+    Only products this scrape listed before and no longer does are removed, so
+    refreshed later pages, other categories and load-more results are kept.
+    """
+    logger.info("🚀 Auto-scraping products...")
+    if pages > 1:
+        # Large categories: split the listing pages across worker processes
+        progress(f"Scraping {pages} listing pages in parallel")
+        products = scraper.scrape_parallel(url, pages=pages)
+    else:
+        progress("Scraping listing page")
+        products = scraper.scrape_products(url)
+
+    if not products:
+        logger.error("❌ Auto-scraping failed - no products returned")
+        return {"total_products": store.count(), "new_products_added": 0, "scraped": 0}
+
+    progress(f"Storing {len(products)} products")
+    _, changes = store.sync_products(products, scope=full_scrape_scope(url))
+    total = store.count()
+    store.save_metadata({
+        "total_products": total,
+        "scraped_at": datetime.now().isoformat(),
+        "source": "auto_scrape",
+        "scrape_type": "initial_load",
+        "changes": {change: len(items) for change, items in changes.items()}
+    })
+    # The catalog was rebuilt, so a held VIEW MORE page no longer matches it
+    scraper.close_view_more_session()
+    _prefetch_images(store, changes["added"] + changes["updated"], progress)
+    logger.info(f"✅ Auto-scraped {len(products)} products ({len(changes['added'])} added, "
+                f"{len(changes['updated'])} updated, {len(changes['removed'])} removed)")
+
+    return {"total_products": total, "new_products_added": len(changes["added"]),
+            "products_updated": len(changes["updated"]), "products_removed": len(changes["removed"]),
+            "scraped": len(products)}
+
+
+def scrape_more_products(scraper, store, redis_client, url=DEFAULT_CATEGORY_URL, progress=_no_progress):
+    """Scrape additional products by clicking VIEW MORE and append the new ones"""
+    logger.info("🔄 Scraping more products with VIEW MORE...")
+    progress("Clicking VIEW MORE and loading new products")
+    additional_products = scraper.scrape_with_view_more(url)
+
+    new_products = []
+    if additional_products:
+        logger.info(f"📊 Existing products: {store.count()}, New scraped: {len(additional_products)}")
+        progress(f"Storing {len(additional_products)} scraped products")
+
+        # Duplicate and change detection by product_id + content hash happens in the store
+        _, changes = store.sync_products(additional_products)
+        new_products = changes["added"]
+        new_count = len(new_products)
+        updated_count = len(changes["updated"])
+        unchanged_skipped = len(additional_products) - new_count - updated_count
+
+        logger.info(f"🔍 Change check: {new_count} new, {updated_count} updated, {unchanged_skipped} unchanged skipped")
+
+        # Store updated metadata; only the new batch was written, nothing is re-read
+        if new_count or updated_count:
+            total = store.count()
+            store.save_metadata({
+                "total_products": total,
+                "scraped_at": datetime.now().isoformat(),
+                "source": "view_more_scrape",
+                "scrape_type": "load_more",
+                "new_products_added": new_count,
+                "products_updated": updated_count
+            })
+            logger.info(f"✅ Added {new_count} new products (total: {total})")
+            _prefetch_images(store, new_products + changes["updated"], progress)
+
+    return {
+        "total_products": store.count(),
+        "new_products_added": len(new_products),
+        "new_product_ids": [p["product_id"] for p in new_products],
+        "scraped": len(additional_products),
+        "scrape_type": "load_more"
+    }
+
+
+def refresh_pages(scraper, store, redis_client, targets, concurrency=2, interval=DEFAULT_INTERVAL,
+                  progress=_no_progress):
+    """Re-scrape the listing pages picked by the scheduler and store what changed"""
+    logger.info(f"🗓️ Refreshing {len(targets)} listing pages...")
+    progress(f"Fetching {len(targets)} listing pages")
+
+    def fetch(target):
+        url, page = target
+        try:
+            products = scraper.http_scraper.fetch_listing_page(url, page)
+        except Exception as e:
+            logger.warning(f"Refresh of {url} page {page} failed: {e}")
+            products = []
+        if not products and page == 0:
+            # The first page can still be read with the browser when the HTTP path is blocked
+            products = scraper.scrape_products(url)
+        return products
+
+    # Pages are fetched over HTTP, so a small pool bounds the load put on the site
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+        results = list(pool.map(fetch, targets))
+
+    added, updated, removed, scraped = [], [], [], 0
+    for (url, page), products in zip(targets, results):
+        if not products:
+            # Failed or empty: retried later with a growing delay instead of on every tick
+            entry = record_page_failure(redis_client, url, page, interval=interval)
+            logger.warning(f"{url} page {page} returned no products ({entry['failures']} in a row)")
+            continue
+        # Pages are synced one by one so each gets its own change count; products that
+        # dropped off this page are removed unless another scrape still lists them
+        _, changes = store.sync_products(products, scope=page_id(url, page))
+        changed = len(changes["added"]) + len(changes["updated"]) + len(changes["removed"])
+        entry = record_page_scrape(redis_client, url, page, len(products), changed, interval=interval)
+        logger.info(f"🔍 {url} page {page}: {changed}/{len(products)} changed "
+                    f"(change rate {entry['change_rate']:.2f})")
+        added += changes["added"]
+        updated += changes["updated"]
+        removed += changes["removed"]
+        scraped += len(products)
+
+    if added or updated or removed:
+        total = store.count()
+        store.save_metadata({
+            "total_products": total,
+            "scraped_at": datetime.now().isoformat(),
+            "source": "scheduled_refresh",
+            "scrape_type": "refresh",
+            "new_products_added": len(added),
+            "products_updated": len(updated),
+            "products_removed": len(removed)
+        })
+        _prefetch_images(store, added + updated, progress)
+    logger.info(f"✅ Refreshed {len(targets)} pages: {len(added)} added, {len(updated)} updated, "
+                f"{len(removed)} removed")
+
+    return {
+        "total_products": store.count(),
+        "new_products_added": len(added),
+        "products_updated": len(updated),
+        "products_removed": len(removed),
+        "pages": len(targets),
+        "scraped": scraped,
+        "scrape_type": "refresh"
+    }
+
+
+# Job type -> task function, used by the scrape worker
+TASKS = {
+    "full_scrape": auto_scrape_products,
+    "load_more": scrape_more_products,
+    "refresh_pages": refresh_pages,
+}
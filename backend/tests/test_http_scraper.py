@@ -0,0 +1,156 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from http_scraper import CromaHttpScraper, DEFAULT_AVAILABILITY
+from scraper import CromaProductScraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves recorded Croma responses: listing API pages and listing HTML"""
+
+    routes = {
+        "/searchservices/v1/category/997": ("application/json", "listing_api_page0.json"),
+        "/deals/televisions": ("text/html", "listing_page_embedded_state.html"),
+        "/empty/c/404": ("text/html", "listing_page_empty.html"),
+    }
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        route = self.routes.get(parsed.path)
+        if route is None:
+            self.send_error(404)
+            return
+        mimetype, name = route
+        # Only the first page is recorded; later pages are empty like past the end of a listing
+        if query.get("currentPage", ["0"])[0] != "0" or query.get("page", ["0"])[0] != "0":
+            body = b'{"products": []}' if mimetype == "application/json" else _fixture("listing_page_empty.html")
+        else:
+            body = _fixture(name)
+        self.send_response(200)
+        self.send_header("Content-Type", f"{mimetype}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def fixture_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scraper(fixture_server):
+    scraper = CromaProductScraper()
+    scraper.http_scraper.close()
+    scraper.http_scraper = CromaHttpScraper(base_url=fixture_server, api_base=fixture_server)
+    yield scraper
+    scraper.http_scraper.close()
+
+
+def test_scrape_products_maps_listing_api(scraper, fixture_server, monkeypatch):
+    monkeypatch.setattr(scraper, "scrape_with_selenium", lambda url: pytest.fail("Selenium fallback was used"))
+
+    products = scraper.scrape_products(f"{fixture_server}/televisions-accessories/c/997")
+
+    assert products == [
+        {
+            "product_id": "300742",
+            "title": "Samsung Crystal 4K 138 cm (55 inch) Ultra HD LED Smart Tizen TV",
+            "brand": "Samsung",
+            "image": "https://media.croma.com/image/upload/v1/Croma%20Assets/300742_0.png",
+            "url": f"{fixture_server}/samsung-crystal-4k-55-inch-tv/p/300742",
+            "rating": "4.3",
+            "review_count": "128",
+            "current_price": "₹42,990",
+            "original_price": "₹64,900",
+            "discount": "34% Off",
+            "offers": ["Bank offer: 10% instant discount"],
+            "availability": "Delivery by Monday",
+            "price_paise": 4299000,
+            "original_price_paise": 6490000,
+            "discount_percent": 34.0,
+            "rating_value": 4.3,
+            "review_count_value": 128,
+        },
+        {
+            "product_id": "271234",
+            "title": "Croma 80 cm (32 inch) HD Ready LED TV",
+            "brand": "Croma",
+            "image": f"{fixture_server}/medias/271234.png",
+            "url": "https://www.croma.com/croma-32-inch-hd-tv/p/271234",
+            "current_price": "₹10,990",
+            "original_price": "₹16,990",
+            "offers": [],
+            "availability": DEFAULT_AVAILABILITY,
+            "price_paise": 1099000,
+            "original_price_paise": 1699000,
+            "discount_percent": 35.3,
+            "rating_value": None,
+            "review_count_value": None,
+        },
+    ]
+
+
+def test_scrape_products_reads_embedded_state(scraper, fixture_server, monkeypatch):
+    monkeypatch.setattr(scraper, "scrape_with_selenium", lambda url: pytest.fail("Selenium fallback was used"))
+
+    products = scraper.scrape_products(f"{fixture_server}/deals/televisions")
+
+    assert len(products) == 1
+    product = products[0]
+    assert product["product_id"] == "305511"
+    assert product["brand"] == "LG"
+    assert product["rating"] == "4.6"
+    assert product["review_count"] == "41"
+    assert product["current_price"] == "₹1,24,990"
+    assert product["original_price"] == "₹1,79,990"
+    assert product["offers"] == ["No Cost EMI"]
+    assert product["price_paise"] == 12499000
+
+
+def test_scrape_products_falls_back_to_selenium(scraper, fixture_server, monkeypatch):
+    selenium_products = [{"product_id": "croma_product_1", "title": "From the browser"}]
+    calls = []
+
+    def scrape_with_selenium(url):
+        calls.append(url)
+        return selenium_products
+
+    monkeypatch.setattr(scraper, "scrape_with_selenium", scrape_with_selenium)
+    url = f"{fixture_server}/empty/c/404"
+
+    assert scraper.scrape_products(url) == selenium_products
+    assert calls == [url]
+
+
+def test_scrape_parallel_workers_use_the_scraper_config(scraper, fixture_server, monkeypatch):
+    monkeypatch.setattr(scraper, "scrape_with_selenium", lambda url: pytest.fail("Selenium fallback was used"))
+
+    products = scraper.scrape_parallel(f"{fixture_server}/televisions-accessories/c/997", pages=2, workers=2)
+
+    assert [product["product_id"] for product in products] == ["300742", "271234"]
+    assert products[0]["url"] == f"{fixture_server}/samsung-crystal-4k-55-inch-tv/p/300742"
+
+
+def test_scrape_parallel_without_pages(scraper):
+    assert scraper.scrape_parallel("https://www.croma.com/televisions-accessories/c/997", pages=0) == []
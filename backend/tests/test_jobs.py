@@ -0,0 +1,66 @@
+import fakeredis
+import pytest
+
+from jobs import ACTIVE_JOB_KEY_PREFIX, JOB_COMPLETED, JOB_FAILED, JOB_RUNNING, JobQueue
+
+
+@pytest.fixture
+def queue():
+    return JobQueue(fakeredis.FakeRedis())
+
+
+def test_enqueue_shares_the_pending_job(queue):
+    job_id, created = queue.enqueue("load_more")
+
+    assert created
+    assert queue.enqueue("load_more") == (job_id, False)
+
+
+def test_enqueue_replaces_the_marker_of_a_finished_job(queue):
+    job_id, _ = queue.enqueue("load_more")
+    queue.update(job_id, status=JOB_COMPLETED)
+
+    new_id, created = queue.enqueue("load_more")
+
+    assert created and new_id != job_id
+    assert queue.is_active("load_more")
+
+
+def test_enqueue_fails_a_job_whose_worker_died(queue):
+    job_id, _ = queue.enqueue("full_scrape")
+    # Running without the scrape lock held
+    queue.update(job_id, status=JOB_RUNNING)
+
+    new_id, created = queue.enqueue("full_scrape")
+
+    assert created and new_id != job_id
+    assert queue.get(job_id)["status"] == JOB_FAILED
+    assert queue.is_active("full_scrape")
+
+
+def test_enqueue_loses_the_race_for_a_stale_marker(queue, monkeypatch):
+    stale_id, _ = queue.enqueue("load_more")
+    queue.update(stale_id, status=JOB_COMPLETED)
+    other_id, _ = queue.enqueue("other")
+    get = queue.get
+
+    def get_then_replaced(job_id):
+        job = get(job_id)
+        if job_id == stale_id:
+            # Another process replaces the stale marker after we read it
+            queue.redis.set(f"{ACTIVE_JOB_KEY_PREFIX}load_more", other_id)
+        return job
+
+    monkeypatch.setattr(queue, "get", get_then_replaced)
+
+    assert queue.enqueue("load_more") == (other_id, False)
+    assert queue.queue_length() == 2
+
+
+def test_finish_keeps_a_newer_marker(queue):
+    job_id, _ = queue.enqueue("load_more")
+    queue.redis.set(f"{ACTIVE_JOB_KEY_PREFIX}load_more", "newer")
+
+    queue.finish(job_id, "load_more", JOB_COMPLETED)
+
+    assert queue.redis.get(f"{ACTIVE_JOB_KEY_PREFIX}load_more") == b"newer"
@@ -0,0 +1,50 @@
+import fakeredis
+import pytest
+
+from price_history import PriceHistory
+
+
+@pytest.fixture
+def history():
+    return PriceHistory(fakeredis.FakeRedis())
+
+
+def _product(price, original=1699000, discount=35.3):
+    return {"product_id": "271234", "price_paise": price, "original_price_paise": original,
+            "discount_percent": discount}
+
+
+def test_points_keep_fractional_discounts(history):
+    history.record([_product(1099000)], timestamp=100)
+    # Only the discount changed, by less than a whole percent
+    history.record([_product(1099000, discount=35.7)], timestamp=200)
+
+    assert history.get_points("271234") == [
+        {"timestamp": 100, "price_paise": 1099000, "original_price_paise": 1699000, "discount_percent": 35.3},
+        {"timestamp": 200, "price_paise": 1099000, "original_price_paise": 1699000, "discount_percent": 35.7},
+    ]
+
+
+def test_window_stats_only_cover_the_window(history):
+    for timestamp, price in [(100, 1099000), (200, 999000), (300, 1199000), (400, 899000)]:
+        history.record([_product(price)], timestamp=timestamp)
+
+    assert history.get_window_stats("271234", 150, 300) == {
+        "points": 2,
+        "min_price_paise": 999000,
+        "max_price_paise": 1199000,
+        "avg_price_paise": 1099000,
+    }
+    assert history.get_window_stats("271234", 500, 600) is None
+    assert history.get_stats("271234")["min_price_paise"] == 899000
+
+
+def test_window_stats_skip_points_without_a_price(history):
+    history.record([_product(None)], timestamp=100)
+
+    assert history.get_window_stats("271234") == {
+        "points": 1,
+        "min_price_paise": None,
+        "max_price_paise": None,
+        "avg_price_paise": None,
+    }
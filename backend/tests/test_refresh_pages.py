@@ -0,0 +1,113 @@
+import json
+
+import fakeredis
+import pytest
+
+from scheduler import SCHEDULE_STATE_KEY, RescrapeScheduler, page_id
+from storage import ProductStore
+from tasks import auto_scrape_products, refresh_pages
+
+URL = "https://www.croma.com/televisions-accessories/c/997"
+INTERVAL = 3600
+
+
+def _products(*ids):
+    return [{"product_id": pid, "title": f"TV {pid}", "brand": "Croma", "current_price": "₹10,990"} for pid in ids]
+
+
+class FakeHttpScraper:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def fetch_listing_page(self, url, page):
+        result = self.pages.get(page)
+        if isinstance(result, Exception):
+            raise result
+        return result or []
+
+
+class FakeScraper:
+    """Serves listing pages from a dict; page 0's Selenium fallback is counted"""
+
+    def __init__(self, pages, full_scrape=None):
+        self.http_scraper = FakeHttpScraper(pages)
+        self.full_scrape = full_scrape or []
+        self.selenium_calls = 0
+
+    def scrape_products(self, url):
+        self.selenium_calls += 1
+        return self.full_scrape
+
+    def close_view_more_session(self):
+        pass
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def store(redis_client):
+    return ProductStore(redis_client)
+
+
+def _state(redis_client, page):
+    return json.loads(redis_client.hget(SCHEDULE_STATE_KEY, page_id(URL, page)))
+
+
+def test_empty_and_failed_pages_back_off(redis_client, store):
+    scraper = FakeScraper({1: _products("a", "b"), 2: [], 0: RuntimeError("blocked")})
+    targets = [[URL, 0], [URL, 1], [URL, 2]]
+
+    refresh_pages(scraper, store, redis_client, targets, interval=INTERVAL)
+
+    assert scraper.selenium_calls == 1
+    for page in (0, 2):
+        entry = _state(redis_client, page)
+        assert entry["failures"] == 1
+        assert entry["next_due"] > entry["last_failed"] + INTERVAL * 0.8
+    assert _state(redis_client, 1)["failures"] == 0
+
+    scheduler = RescrapeScheduler(redis_client, job_queue=None, category_urls=[URL], pages=3, interval=INTERVAL)
+    assert scheduler.due_pages() == []
+
+    # A second failure in a row waits twice as long
+    first_delay = _state(redis_client, 2)["next_due"] - _state(redis_client, 2)["last_failed"]
+    refresh_pages(scraper, store, redis_client, [[URL, 2]], interval=INTERVAL)
+    entry = _state(redis_client, 2)
+    assert entry["failures"] == 2
+    assert entry["next_due"] - entry["last_failed"] > first_delay * 1.5
+
+
+def test_success_resets_failures(redis_client, store):
+    scraper = FakeScraper({1: []})
+    refresh_pages(scraper, store, redis_client, [[URL, 1]], interval=INTERVAL)
+    scraper.http_scraper.pages[1] = _products("a")
+    refresh_pages(scraper, store, redis_client, [[URL, 1]], interval=INTERVAL)
+    assert _state(redis_client, 1)["failures"] == 0
+
+
+def test_full_scrape_keeps_products_listed_elsewhere(redis_client, store):
+    scraper = FakeScraper({1: _products("p1a", "p1b")}, full_scrape=_products("p0a", "p0b"))
+    auto_scrape_products(scraper, store, redis_client, url=URL)
+    refresh_pages(scraper, store, redis_client, [[URL, 1]], interval=INTERVAL)
+    store.sync_products(_products("more"))  # load-more result, owned by no scope
+
+    scraper.full_scrape = _products("p0a", "p1a")
+    result = auto_scrape_products(scraper, store, redis_client, url=URL)
+
+    # Only p0b left the page-0 listing; p1a moved there and is still listed
+    assert result["products_removed"] == 1
+    assert sorted(p["product_id"] for p in store.get_all()) == ["more", "p0a", "p1a", "p1b"]
+
+
+def test_refresh_removes_products_dropped_from_its_page(redis_client, store):
+    scraper = FakeScraper({1: _products("a", "b")})
+    refresh_pages(scraper, store, redis_client, [[URL, 1]], interval=INTERVAL)
+
+    scraper.http_scraper.pages[1] = _products("a")
+    result = refresh_pages(scraper, store, redis_client, [[URL, 1]], interval=INTERVAL)
+
+    assert result["products_removed"] == 1
+    assert [p["product_id"] for p in store.get_all()] == ["a"]
@@ -0,0 +1,81 @@
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+import serialization
+
+logger = logging.getLogger(__name__)
+
+# A catalog scraped less than this many seconds ago is served as is on startup
+CATALOG_MAX_AGE = int(os.environ.get("CATALOG_MAX_AGE", str(6 * 3600)))
+
+# Local copy of the catalog, restored when Redis comes up empty; CATALOG_SNAPSHOT=0 disables it.
+# Kept with the app's data rather than in the temp dir, which may be cleared on reboot.
+SNAPSHOT_ENABLED = os.environ.get("CATALOG_SNAPSHOT", "1") != "0"
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+DEFAULT_SNAPSHOT_PATH = os.environ.get("WARM_START_SNAPSHOT", os.path.join(DATA_DIR, "catalog.snapshot"))
+
+
+def catalog_age(metadata):
+    """Seconds since the catalog was scraped, or None when unknown"""
+    scraped_at = (metadata or {}).get("scraped_at")
+    if not scraped_at:
+        return None
+    try:
+        return (datetime.now() - datetime.fromisoformat(scraped_at)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+
+def is_fresh(metadata, max_age=CATALOG_MAX_AGE):
+    age = catalog_age(metadata)
+    return age is not None and age <= max_age
+
+
+def save_snapshot(store, path=DEFAULT_SNAPSHOT_PATH):
+    """
+    Write the catalog and its metadata to `path` as columnar, zlib-compressed JSON.
+    The file is replaced atomically; returns the number of products written.
+    """
+    products = store.get_all()
+    if not products:
+        return 0
+    snapshot = {"metadata": store.get_metadata() or {}, "catalog": serialization.to_columns(products)}
+    data = serialization.encode(snapshot, serialization.FORMAT_JSON, serialization.COMPRESSION_ZLIB)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return len(products)
+
+
+def load_snapshot(path=DEFAULT_SNAPSHOT_PATH):
+    """Return (products, metadata) from a snapshot file, or None when missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            snapshot = serialization.decode(f.read())
+        return serialization.from_columns(snapshot["catalog"]), snapshot["metadata"]
+    except Exception as e:
+        logger.warning(f"Catalog snapshot {path} could not be read: {e}")
+        return None
+
+
+def restore_snapshot(store, path=DEFAULT_SNAPSHOT_PATH):
+    """Load the snapshot into an empty store; returns the number of products restored"""
+    if store.count():
+        return 0
+    loaded = load_snapshot(path)
+    if not loaded:
+        return 0
+    products, metadata = loaded
+    stored, _ = store.sync_products(products, replace=True)
+    # The original scraped_at is kept, so a restored catalog is still judged by its real age
+    store.save_metadata(dict(metadata, restored_from="snapshot"))
+    logger.info(f"💾 Restored {len(stored)} products from catalog snapshot")
+    return len(stored)
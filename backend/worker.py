@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+import traceback
+
+import redis
+
+from jobs import JOB_COMPLETED, JOB_FAILED, JOB_RUNNING, JobQueue, RedisLock
+from tasks import TASKS
+from warm_start import SNAPSHOT_ENABLED, save_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeWorker:
+    """
+    Pops scrape jobs from the Redis queue and runs them one at a time.
+    A distributed lock guarantees a single scrape across all workers and API processes;
+    it is extended in the background while a long Selenium scrape runs.
+    """
+
+    def __init__(self, redis_client, scraper=None, store=None, lock_ttl=600):
+        self.redis = redis_client
+        self.queue = JobQueue(redis_client)
+        self.lock = RedisLock(redis_client, ttl_seconds=lock_ttl)
+        self._scraper = scraper
+        self._store = store
+
+    @property
+    def scraper(self):
+        # Created lazily so an idle worker does not start browsers
+        if self._scraper is None:
+            from scraper import CromaProductScraper
+            self._scraper = CromaProductScraper()
+        return self._scraper
+
+    @property
+    def store(self):
+        return self._store if self._store is not None else self.scraper.store
+
+    def run_forever(self, stop_event=None):
+        logger.info("👷 Scrape worker started")
+        try:
+            recovered = self.queue.recover()
+            if recovered:
+                logger.info(f"♻️ Requeued {recovered} jobs left behind by stopped workers")
+        except redis.ConnectionError as e:
+            logger.error(f"Could not recover unfinished jobs: {e}")
+        while not (stop_event and stop_event.is_set()):
+            try:
+                job = self.queue.dequeue(timeout=5)
+                if job:
+                    self.process(job)
+            except redis.ConnectionError as e:
+                logger.error(f"Worker lost Redis connection: {e}")
+                time.sleep(5)
+
+    def process(self, job):
+        job_id, job_type = job["id"], job["type"]
+        task = TASKS.get(job_type)
+        if task is None:
+            self.queue.finish(job_id, job_type, JOB_FAILED, error=f"Unknown job type '{job_type}'")
+            return
+
+        if not self.lock.acquire(blocking=True, timeout=30):
+            # Another process is scraping; try again shortly
+            self.queue.set_progress(job_id, "Waiting for another scrape to finish")
+            self.queue.requeue(job_id)
+            time.sleep(2)
+            return
+
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_lock, args=(stop_heartbeat,), daemon=True)
+        heartbeat.start()
+        try:
+            logger.info(f"▶️ Running {job_type} job {job_id}")
+            self.queue.update(job_id, status=JOB_RUNNING, started_at=time.time(), progress="Starting")
+            version = self.store.get_version()
+            result = task(
+                self.scraper, self.store, self.redis, **job["params"],
+                progress=lambda message: self.queue.set_progress(job_id, message)
+            )
+            if self.store.get_version() != version:
+                self._snapshot()
+            self.queue.finish(job_id, job_type, JOB_COMPLETED, result=result)
+            logger.info(f"✅ {job_type} job {job_id} completed: {result.get('new_products_added', 0)} new products")
+        except Exception as e:
+            logger.error(f"❌ {job_type} job {job_id} failed: {e}")
+            traceback.print_exc()
+            self.queue.finish(job_id, job_type, JOB_FAILED, error=str(e))
+        finally:
+            stop_heartbeat.set()
+            self.lock.release()
+
+    def _snapshot(self):
+        """Refresh the local catalog snapshot used to warm-start an empty Redis"""
+        if not SNAPSHOT_ENABLED:
+            return
+        try:
+            count = save_snapshot(self.store)
+            logger.info(f"💾 Catalog snapshot saved: {count} products")
+        except Exception as e:
+            logger.warning(f"Could not save catalog snapshot: {e}")
+
+    def _keep_lock(self, stop_event):
+        interval = max(self.lock.ttl_ms / 3000, 1)
+        while not stop_event.wait(interval):
+            if not self.lock.extend():
+                logger.warning("Scrape lock was lost while a job was running")
+                return
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ScrapeWorker(redis.Redis(host='localhost', port=6379, db=0)).run_forever()